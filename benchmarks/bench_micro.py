@@ -0,0 +1,392 @@
+"""Micro-benchmarks of CPU bound parts of Slack notifications.
+
+Covers template filling, mention translation, user lookup in directory,
+escaping of missing template keys and profile matching with realistic
+anatomy data, 10k users directory and messages with many mentions.
+
+Benchmarks which need unavailable dependencies ('ayon_core' for template
+filling, 'pyblish' for plugin methods) are skipped. Skipped benchmarks
+are listed with the reason in saved baseline, record it in environment
+of AYON launcher to get all numbers.
+
+    python benchmarks/bench_micro.py
+    python benchmarks/bench_micro.py --save baselines/micro.json
+    python benchmarks/bench_micro.py --compare baselines/micro.json --fail
+"""
+import os
+import sys
+import json
+import timeit
+import random
+import argparse
+import platform
+import statistics
+import importlib.util
+
+from common import add_client_to_path, import_slack_lib
+
+USERS_COUNT = 10000
+GROUPS_COUNT = 200
+MENTIONS_COUNT = 40
+# Medians slower than baseline by more than this ratio are reported,
+#   differences between runs on the same machine reach about 1.4x
+REGRESSION_THRESHOLD = 1.5
+
+lib = import_slack_lib()
+
+
+class SkipBenchmark(Exception):
+    pass
+
+
+def get_users_payload(count=USERS_COUNT):
+    users = []
+    for index in range(count):
+        users.append({
+            "id": "U{:08d}".format(index),
+            "name": "artist.{:05d}".format(index),
+            "deleted": index % 50 == 49,
+            "profile": {
+                "display_name": "Artist {}".format(index),
+                "real_name": "Artist Real {}".format(index),
+            },
+        })
+    return users
+
+
+def get_groups_payload(count=GROUPS_COUNT):
+    return [
+        {
+            "id": "S{:08d}".format(index),
+            "name": "Department {}".format(index),
+            "handle": "dept{:03d}".format(index),
+        }
+        for index in range(count)
+    ]
+
+
+def get_directory():
+    directory = lib.SlackDirectory()
+    directory.add_users(get_users_payload())
+    directory.add_groups(get_groups_payload())
+    return directory
+
+
+def get_mentions_message(count=MENTIONS_COUNT, seed=0):
+    rnd = random.Random(seed)
+    parts = [
+        "renderMain v012 of sh0420 (LIGHTING) was published, please review."
+    ]
+    for index in range(count):
+        kind = index % 5
+        user_index = rnd.randrange(USERS_COUNT)
+        if kind == 0:
+            parts.append('"@Artist Real {}"'.format(user_index))
+        elif kind == 1:
+            parts.append("@dept{:03d}".format(rnd.randrange(GROUPS_COUNT)))
+        elif kind == 2:
+            parts.append("@unknown{},".format(index))
+        elif kind == 3:
+            parts.append("mail artist{}@studio.com".format(user_index))
+        else:
+            parts.append("@artist.{:05d}".format(user_index))
+    parts.append("@here")
+    return " ".join(parts)
+
+
+def get_anatomy_data():
+    return {
+        "project": {"name": "feature_film", "code": "ff"},
+        "folder": {
+            "name": "sh0420",
+            "type": "Shot",
+            "path": "/episodes/ep01/sq010/sh0420",
+            "parents": ["episodes", "ep01", "sq010"],
+        },
+        "hierarchy": "episodes/ep01/sq010",
+        "task": {"name": "lighting", "type": "Lighting", "short": "lgt"},
+        "product": {"name": "renderLightingMain", "type": "render"},
+        "version": 12,
+        "user": "artist.00042",
+        "app": "maya",
+        "frame": "1001",
+        "ext": "exr",
+        "username": "artist.00042",
+        "comment": "Fixed flickering in reflections",
+        "root": {"work": "/mnt/projects"},
+        "review_filepath": "/mnt/projects/ff/review/sh0420_v012.mov",
+    }
+
+
+MESSAGE_TEMPLATE = (
+    "{Product[name]} v{version:0>3} of {Folder[name]} ({TASK[NAME]})"
+    " in {project[code]} was published: {comment}\n"
+    "Review: {review_filepath}"
+)
+
+
+def _load_plugin_class():
+    if importlib.util.find_spec("pyblish") is None:
+        raise SkipBenchmark("'pyblish' is not available")
+    if importlib.util.find_spec("ayon_core") is None:
+        raise SkipBenchmark("'ayon_core' is not available")
+    add_client_to_path()
+    from ayon_slack.plugins.publish.integrate_slack_api import (
+        IntegrateSlackAPI,
+    )
+    return IntegrateSlackAPI
+
+
+def _require_ayon_core():
+    if importlib.util.find_spec("ayon_core") is None:
+        raise SkipBenchmark("'ayon_core' is not available")
+
+
+def setup_translate_mentions():
+    directory = get_directory()
+    message = get_mentions_message()
+
+    def _resolve(name):
+        mention = lib.SPECIAL_MENTIONS.get(name.casefold())
+        if mention:
+            return mention
+        slack_id = directory.get_user_id(name)
+        if slack_id:
+            return "<@{}>".format(slack_id)
+        slack_id = directory.get_group_id(name)
+        if slack_id:
+            return "<!subteam^{}>".format(slack_id)
+        return None
+
+    return lambda: lib.translate_mentions(message, _resolve)
+
+
+def setup_translate_users():
+    plugin = _load_plugin_class()()
+    directory = get_directory()
+    message = get_mentions_message()
+    aliases = lib.get_alias_mentions(
+        [{"name": "artist.00001", "slack_id": "U00000001"}], []
+    )
+    return lambda: plugin._translate_users(
+        message, aliases, lambda: directory
+    )
+
+
+def setup_get_user_id():
+    directory = get_directory()
+    rnd = random.Random(1)
+    names = []
+    for index in range(1000):
+        user_index = rnd.randrange(USERS_COUNT)
+        names.append(
+            ("artist.{:05d}", "Artist {}", "ARTIST REAL {}", "nobody{}")[
+                index % 4
+            ].format(user_index)
+        )
+
+    def _lookup():
+        for name in names:
+            directory.get_user_id(name)
+
+    return _lookup
+
+
+def setup_build_directory():
+    users = get_users_payload()
+    groups = get_groups_payload()
+    return lambda: lib.SlackDirectory.from_payload(
+        *_to_payload(users, groups)
+    )
+
+
+def _to_payload(users, groups):
+    directory = lib.SlackDirectory()
+    directory.add_users(users)
+    directory.add_groups(groups)
+    return directory.to_payload()
+
+
+def setup_fill_template():
+    _require_ayon_core()
+    anatomy_data = get_anatomy_data()
+
+    def _fill():
+        fill_data = lib.CaseVariantsData(anatomy_data)
+        return lib.compile_template(MESSAGE_TEMPLATE).format(fill_data)
+
+    return _fill
+
+
+def setup_get_filled_content():
+    plugin = _load_plugin_class()()
+    fill_data = lib.CaseVariantsData(get_anatomy_data())
+    return lambda: plugin._get_filled_content(
+        MESSAGE_TEMPLATE, None, fill_data=fill_data
+    )
+
+
+def setup_escape_missing_keys():
+    plugin = _load_plugin_class()()
+    fill_data = get_anatomy_data()
+    message = MESSAGE_TEMPLATE + " {missing} {other[key]} {Unknown}"
+    return lambda: plugin._escape_missing_keys(message, fill_data)
+
+
+def setup_profile_match():
+    profiles = []
+    for index in range(200):
+        profiles.append({
+            "host_names": ["maya", "houdini"][index % 2:index % 2 + 1],
+            "product_base_types": ["render", "review", "model"][index % 3:],
+            "task_types": [],
+            "task_names": ["lighting", "comp.*"][index % 2:],
+            "product_names": [],
+            "channel_messages": [],
+        })
+    matcher = lib.SlackProfileMatcher(profiles)
+    keys = [
+        {
+            "product_base_types": ("render", "model")[index % 2],
+            "host_names": ("maya", "houdini", "nuke")[index % 3],
+            "task_names": "lighting",
+            "task_types": "Lighting",
+            "product_names": "product{}".format(index),
+        }
+        for index in range(100)
+    ]
+
+    def _match():
+        for key_values in keys:
+            matcher.match(key_values)
+
+    return _match
+
+
+BENCHMARKS = {
+    "translate_mentions": setup_translate_mentions,
+    "plugin._translate_users": setup_translate_users,
+    "directory.get_user_id_x1000": setup_get_user_id,
+    "directory.build_10k": setup_build_directory,
+    "template.fill": setup_fill_template,
+    "plugin._get_filled_content": setup_get_filled_content,
+    "plugin._escape_missing_keys": setup_escape_missing_keys,
+    "profiles.match_x100": setup_profile_match,
+}
+
+
+def run_benchmark(func, repeat):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    timings = [
+        duration / number
+        for duration in timer.repeat(repeat=repeat, number=number)
+    ]
+    return {
+        "best": min(timings),
+        "median": statistics.median(timings),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def format_time(seconds):
+    for unit, factor in (("s", 1), ("ms", 1e3), ("us", 1e6)):
+        if seconds * factor >= 1:
+            return "{:.3f} {}".format(seconds * factor, unit)
+    return "{:.1f} ns".format(seconds * 1e9)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", help="Run benchmarks containing text")
+    parser.add_argument("--repeat", type=int, default=9)
+    parser.add_argument("--save", help="Save results to JSON file")
+    parser.add_argument("--compare", help="Compare with saved JSON file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=REGRESSION_THRESHOLD,
+        help="Ratio of median to baseline median reported as regression",
+    )
+    parser.add_argument(
+        "--fail",
+        action="store_true",
+        help="Exit with code 1 when a regression is reported",
+    )
+    args = parser.parse_args()
+
+    baseline = None
+    baseline_skipped = {}
+    if args.compare:
+        with open(args.compare, "r") as stream:
+            baseline_data = json.load(stream)
+        baseline = baseline_data["results"]
+        baseline_skipped = baseline_data.get("skipped") or {}
+
+    results = {}
+    skipped = {}
+    regressions = []
+    for name, setup in BENCHMARKS.items():
+        if args.filter and args.filter not in name:
+            continue
+        try:
+            func = setup()
+        except SkipBenchmark as exc:
+            print("{:<32} skipped: {}".format(name, exc))
+            skipped[name] = str(exc)
+            continue
+
+        result = run_benchmark(func, args.repeat)
+        results[name] = result
+        line = "{:<32} {:>12} (best {})".format(
+            name, format_time(result["median"]), format_time(result["best"])
+        )
+        if baseline is not None:
+            if name in baseline:
+                # Median is less sensitive to noise of shared machines
+                ratio = result["median"] / baseline[name]["median"]
+                line += "  {:.2f}x baseline".format(ratio)
+                if ratio > args.threshold:
+                    regressions.append(name)
+            elif name in baseline_skipped:
+                line += "  no baseline (skipped: {})".format(
+                    baseline_skipped[name]
+                )
+            else:
+                line += "  no baseline"
+        print(line)
+
+    if args.save:
+        if args.filter:
+            print("Baseline was not saved, it must contain all benchmarks.")
+            return 1
+        if skipped:
+            print("Baseline does not contain skipped benchmarks: {}".format(
+                ", ".join(skipped)
+            ))
+        os.makedirs(
+            os.path.dirname(os.path.abspath(args.save)), exist_ok=True
+        )
+        with open(args.save, "w") as stream:
+            json.dump(
+                {
+                    "python": sys.version.split()[0],
+                    "platform": platform.platform(),
+                    "machine": platform.machine(),
+                    "results": results,
+                    "skipped": skipped,
+                },
+                stream,
+                indent=4
+            )
+
+    if regressions:
+        print("Slower than baseline: {}".format(", ".join(regressions)))
+        if args.fail:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
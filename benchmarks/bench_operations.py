@@ -0,0 +1,120 @@
+"""Benchmark 'SlackOperations' against local fake Slack API.
+
+Measures download of workspace directory, file uploads (small and
+streamed) and posting of messages. Requires 'slack_sdk'.
+
+    python benchmarks/bench_operations.py --users 10000 --messages 500
+"""
+import os
+import json
+import argparse
+import tempfile
+
+from common import (
+    import_slack_lib,
+    get_logger,
+    fake_slack_env,
+    LatencyRecorder,
+    format_results,
+)
+from fake_slack import (
+    FakeSlackServer,
+    add_config_arguments,
+    config_from_args,
+)
+
+SlackOperations = import_slack_lib().SlackOperations
+
+
+def bench_directory(log, repeats):
+    recorder = LatencyRecorder("directory.download")
+    for _ in range(repeats):
+        operations = SlackOperations("xoxb-benchmark", log)
+        with recorder.measure():
+            directory = operations.get_directory()
+        operations.close()
+    log.info("Directory contains {} users".format(
+        len(directory.to_payload()[0])
+    ))
+    return recorder.get_result()
+
+
+def bench_uploads(log, files, name):
+    operations = SlackOperations("xoxb-benchmark", log)
+    recorder = LatencyRecorder(name)
+    for path in files:
+        with recorder.measure():
+            operations.prepare_message("", [path])
+    operations.close()
+    return recorder.get_result()
+
+
+def bench_messages(log, count, channels, attachments):
+    operations = SlackOperations("xoxb-benchmark", log)
+    recorder = LatencyRecorder("send_message")
+    for index in range(count):
+        channel = "#channel{}".format(index % channels)
+        with recorder.measure():
+            operations.send_message(
+                channel, "Message {}".format(index), attachments
+            )
+    operations.close()
+    return recorder.get_result()
+
+
+def create_files(directory, count, size, prefix):
+    paths = []
+    for index in range(count):
+        path = os.path.join(directory, "{}{}.bin".format(prefix, index))
+        with open(path, "wb") as stream:
+            stream.write(os.urandom(size))
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_config_arguments(parser)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--channels", type=int, default=10)
+    parser.add_argument("--uploads", type=int, default=20)
+    parser.add_argument("--upload-size", type=int, default=512 * 1024)
+    parser.add_argument(
+        "--large-upload-size", type=int, default=24 * 1024 * 1024
+    )
+    parser.add_argument("--large-uploads", type=int, default=2)
+    parser.add_argument("--json", help="Write results to JSON file")
+    args = parser.parse_args()
+
+    log = get_logger()
+    server = FakeSlackServer(config_from_args(args))
+    results = []
+    with server, fake_slack_env(server), tempfile.TemporaryDirectory() as tmp:
+        small_files = create_files(
+            tmp, args.uploads, args.upload_size, "small"
+        )
+        large_files = create_files(
+            tmp, args.large_uploads, args.large_upload_size, "large"
+        )
+        results.append(bench_directory(log, args.repeats))
+        results.append(bench_uploads(log, small_files, "upload.small"))
+        results.append(bench_uploads(log, large_files, "upload.streamed"))
+        results.append(
+            bench_messages(
+                log, args.messages, args.channels, small_files[:1]
+            )
+        )
+        stats = server.state.get_stats()
+
+    print(format_results(results))
+    print("Server: {}".format(json.dumps(stats)))
+    if args.json:
+        with open(args.json, "w") as stream:
+            json.dump(
+                {"results": results, "server": stats}, stream, indent=4
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""Benchmark Slack publish plugins with synthetic publish context.
+
+Runs 'CollectSlackFamilies', 'IntegrateSlackAPI', 'IntegrateSlackDigest'
+and 'IntegrateSlackCleanup' on thousands of generated instances against
+local fake Slack API. Requires environment of AYON launcher ('pyblish',
+'ayon_core', 'ayon_api' and 'slack_sdk').
+
+    python benchmarks/bench_publish.py --instances 2000 --users 10000
+"""
+import os
+import json
+import argparse
+import tempfile
+import importlib.util
+
+from common import (
+    CLIENT_DIR,
+    add_client_to_path,
+    get_logger,
+    fake_slack_env,
+    LatencyRecorder,
+    format_results,
+)
+from fake_slack import (
+    FakeSlackServer,
+    add_config_arguments,
+    config_from_args,
+    get_user_name,
+    get_group_name,
+)
+
+add_client_to_path()
+
+import pyblish.api  # noqa: E402
+
+PLUGINS_DIR = os.path.join(CLIENT_DIR, "ayon_slack", "plugins", "publish")
+MESSAGE_TEMPLATE = (
+    "{Product[name]} v{version:0>3} of {folder[name]} ({TASK[NAME]})"
+    " was published by {user[name]}. {comment} {mentions}"
+)
+
+
+class BenchmarkAnatomy:
+    """Minimal anatomy used by message filling."""
+    def __init__(self, root):
+        self.roots = {"work": root}
+
+    def fill_root(self, path):
+        return path.format(root=self.roots)
+
+
+def load_plugin_module(filename):
+    path = os.path.join(PLUGINS_DIR, filename)
+    spec = importlib.util.spec_from_file_location(
+        "slack_benchmark_" + filename[:-3], path
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def get_profiles(channels, digest):
+    return [
+        {
+            "host_names": ["maya"],
+            "product_base_types": ["render", "review"],
+            "task_types": [],
+            "task_names": [],
+            "product_names": [],
+            "review_upload_limit": 50.0,
+            "delivery_workers": 4,
+            "digest": digest,
+            "review_proxy": {"enabled": False},
+            "thumbnail_budget": {"enabled": False},
+            "channel_messages": [
+                {
+                    "channels": [
+                        "#bench{}".format(index)
+                        for index in range(channels)
+                    ],
+                    "upload_thumbnail": True,
+                    "upload_review": False,
+                    "message": MESSAGE_TEMPLATE,
+                }
+            ],
+        },
+        {
+            "host_names": ["houdini"],
+            "product_base_types": [],
+            "task_types": [],
+            "task_names": [],
+            "product_names": [],
+            "channel_messages": [],
+        },
+    ]
+
+
+def create_context(args, tmp_dir):
+    thumbnail_path = os.path.join(tmp_dir, "thumbnail.jpg")
+    with open(thumbnail_path, "wb") as stream:
+        stream.write(os.urandom(args.thumbnail_size))
+
+    context = pyblish.api.Context()
+    context.data.update({
+        "hostName": "maya",
+        "projectName": "benchmark",
+        "user": "artist",
+        "anatomy": BenchmarkAnatomy(tmp_dir),
+        "project_settings": {
+            "slack": {
+                "token": "xoxb-benchmark",
+                "directory_cache_ttl": 0.0,
+                "delivery_mode": "direct",
+                "user_aliases": [],
+                "group_aliases": [],
+            }
+        },
+    })
+
+    for index in range(args.instances):
+        product_name = "renderMain{:05d}".format(index)
+        mentions = " ".join(
+            "@{}".format(get_user_name((index * 7 + offset) % args.users))
+            for offset in range(args.mentions)
+        )
+        if args.groups:
+            mentions += " @{}".format(get_group_name(index % args.groups))
+        instance = context.create_instance(product_name)
+        instance.data.update({
+            "productName": product_name,
+            "productType": "render",
+            "productBaseType": "render",
+            "folderPath": "/shots/sh{:04d}".format(index % 100),
+            "comment": "Benchmark publish",
+            "publish_attributes": {},
+            "representations": [],
+            "anatomyData": {
+                "project": {"name": "benchmark", "code": "bench"},
+                "folder": {"name": "sh{:04d}".format(index % 100)},
+                "task": {"name": "lighting", "type": "Lighting"},
+                "product": {"name": product_name, "type": "render"},
+                "user": {"name": "artist"},
+                "version": index % 20 + 1,
+                "mentions": mentions,
+            },
+        })
+        instance.data["slack_benchmark_thumbnail"] = thumbnail_path
+    return context
+
+
+def run_instance_plugin(plugin, instances, recorder):
+    for instance in instances:
+        if plugin.families and "slack" in plugin.families:
+            if "slack" not in instance.data.get("families", []):
+                continue
+        with recorder.measure():
+            plugin.process(instance)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_config_arguments(parser)
+    parser.add_argument("--instances", type=int, default=1000)
+    parser.add_argument("--channels", type=int, default=2)
+    parser.add_argument("--mentions", type=int, default=3)
+    parser.add_argument("--thumbnail-size", type=int, default=64 * 1024)
+    parser.add_argument("--digest", action="store_true")
+    parser.add_argument("--json", help="Write results to JSON file")
+    args = parser.parse_args()
+
+    log = get_logger()
+    collector_cls = load_plugin_module(
+        "collect_slack_family.py").CollectSlackFamilies
+    integrator_module = load_plugin_module("integrate_slack_api.py")
+    integrator_cls = integrator_module.IntegrateSlackAPI
+    digest_cls = load_plugin_module(
+        "integrate_slack_digest.py").IntegrateSlackDigest
+    cleanup_cls = load_plugin_module(
+        "integrate_slack_cleanup.py").IntegrateSlackCleanup
+    collector_cls.profiles = get_profiles(args.channels, args.digest)
+
+    server = FakeSlackServer(config_from_args(args))
+    results = []
+    with server, fake_slack_env(server), tempfile.TemporaryDirectory() as tmp:
+        context = create_context(args, tmp)
+
+        collector = collector_cls()
+        collector.log = log
+        recorder = LatencyRecorder("CollectSlackFamilies")
+        run_instance_plugin(collector, context, recorder)
+        results.append(recorder.get_result())
+
+        integrator = integrator_cls()
+        integrator.log = log
+        # Thumbnail lookup needs published representations, use
+        #   generated file instead
+        integrator_module.get_thumbnail_path = (
+            lambda instance: instance.data["slack_benchmark_thumbnail"]
+        )
+        recorder = LatencyRecorder("IntegrateSlackAPI")
+        run_instance_plugin(integrator, context, recorder)
+        results.append(recorder.get_result())
+
+        for plugin_cls in (digest_cls, cleanup_cls):
+            plugin = plugin_cls()
+            plugin.log = log
+            recorder = LatencyRecorder(plugin_cls.__name__)
+            with recorder.measure():
+                plugin.process(context)
+            results.append(recorder.get_result())
+
+        stats = server.state.get_stats()
+        metrics = context.data.get("slackMetrics")
+        metrics_data = metrics.to_data() if metrics is not None else {}
+
+    print(format_results(results))
+    print("Server: {}".format(json.dumps(stats)))
+    if metrics is not None:
+        print(metrics.format_summary())
+    if args.json:
+        with open(args.json, "w") as stream:
+            json.dump(
+                {
+                    "results": results,
+                    "server": stats,
+                    "metrics": metrics_data,
+                },
+                stream,
+                indent=4
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Shared helpers of benchmark scripts."""
+import os
+import sys
+import time
+import logging
+import contextlib
+import importlib.util
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+CLIENT_DIR = os.path.join(os.path.dirname(BENCHMARKS_DIR), "client")
+
+
+def add_client_to_path():
+    """Make 'ayon_slack' importable from repository."""
+    if CLIENT_DIR not in sys.path:
+        sys.path.insert(0, CLIENT_DIR)
+
+
+def import_slack_lib():
+    """Import 'ayon_slack.lib' package.
+
+    Package 'ayon_slack' imports addon which requires 'ayon_core', 'lib'
+    subpackage is loaded directly if it is not available.
+    """
+    add_client_to_path()
+    try:
+        import ayon_slack.lib
+
+        return ayon_slack.lib
+    except ImportError:
+        pass
+
+    module_name = "slack_benchmark_lib"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    lib_dir = os.path.join(CLIENT_DIR, "ayon_slack", "lib")
+    spec = importlib.util.spec_from_file_location(
+        module_name,
+        os.path.join(lib_dir, "__init__.py"),
+        submodule_search_locations=[lib_dir],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def get_logger(name="slack_benchmark"):
+    logging.basicConfig(
+        level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s"
+    )
+    return logging.getLogger(name)
+
+
+@contextlib.contextmanager
+def fake_slack_env(server):
+    """Point Slack clients to fake server."""
+    previous = os.environ.get("AYON_SLACK_API_URL")
+    os.environ["AYON_SLACK_API_URL"] = server.api_url
+    try:
+        yield
+    finally:
+        if previous is None:
+            os.environ.pop("AYON_SLACK_API_URL", None)
+        else:
+            os.environ["AYON_SLACK_API_URL"] = previous
+
+
+def percentile(sorted_values, ratio):
+    """Percentile of sorted values using linear interpolation."""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * ratio
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = position - lower
+    return (
+        sorted_values[lower]
+        + (sorted_values[upper] - sorted_values[lower]) * fraction
+    )
+
+
+class LatencyRecorder:
+    """Durations of repeated operation of one benchmark."""
+    def __init__(self, name):
+        self.name = name
+        self.durations = []
+        self._start = None
+        self._end = None
+
+    @contextlib.contextmanager
+    def measure(self):
+        start = time.perf_counter()
+        if self._start is None:
+            self._start = start
+        try:
+            yield
+        finally:
+            self._end = time.perf_counter()
+            self.durations.append(self._end - start)
+
+    def get_result(self):
+        durations = sorted(self.durations)
+        wall_time = 0.0
+        if self._start is not None:
+            wall_time = self._end - self._start
+        count = len(durations)
+        return {
+            "name": self.name,
+            "count": count,
+            "wall_time": wall_time,
+            "throughput": count / wall_time if wall_time else 0.0,
+            "p50": percentile(durations, 0.5),
+            "p90": percentile(durations, 0.9),
+            "p99": percentile(durations, 0.99),
+            "max": durations[-1] if durations else 0.0,
+        }
+
+
+def format_results(results):
+    """Table of benchmark results."""
+    header = "{:<32} {:>7} {:>10} {:>10} {:>10} {:>10} {:>10}".format(
+        "benchmark", "count", "ops/s", "p50 ms", "p90 ms", "p99 ms", "max ms"
+    )
+    lines = [header, "-" * len(header)]
+    for result in results:
+        lines.append(
+            "{:<32} {:>7} {:>10.1f} {:>10.2f} {:>10.2f} {:>10.2f} {:>10.2f}"
+            .format(
+                result["name"],
+                result["count"],
+                result["throughput"],
+                result["p50"] * 1000,
+                result["p90"] * 1000,
+                result["p99"] * 1000,
+                result["max"] * 1000,
+            )
+        )
+    return "\n".join(lines)
@@ -0,0 +1,412 @@
+"""Local stand-in of Slack Web API used by benchmarks.
+
+Implements methods used by the addon:
+    'users.list' and 'usergroups.list' with cursor paging,
+    'users.lookupByEmail', 'files.getUploadURLExternal', upload URL,
+    'files.completeUploadExternal', 'files.info' and 'chat.postMessage'.
+
+Server can add latency to each response, reject part of requests with
+HTTP 429 and pad user objects to simulate larger payloads.
+
+Can be started standalone:
+    python benchmarks/fake_slack.py --users 10000 --latency 0.05
+"""
+import time
+import json
+import random
+import argparse
+import threading
+import collections
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeSlackConfig:
+    """Behavior of the fake server.
+
+    Args:
+        users (int): Number of workspace users.
+        groups (int): Number of usergroups.
+        latency (float): Seconds added to each API response.
+        upload_latency (float): Seconds added to each upload of file content.
+        rate_limit_ratio (float): Ratio (0-1) of API requests rejected
+            with HTTP 429.
+        retry_after (int): Value of 'Retry-After' header of 429 responses.
+        user_payload_bytes (int): Size of padding added to each user.
+        max_page_size (int): Maximum number of items in one page.
+        seed (int): Seed of random generator.
+    """
+    def __init__(
+        self,
+        users=1000,
+        groups=50,
+        latency=0.0,
+        upload_latency=0.0,
+        rate_limit_ratio=0.0,
+        retry_after=1,
+        user_payload_bytes=0,
+        max_page_size=1000,
+        seed=0,
+    ):
+        self.users = users
+        self.groups = groups
+        self.latency = latency
+        self.upload_latency = upload_latency
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        self.user_payload_bytes = user_payload_bytes
+        self.max_page_size = max_page_size
+        self.seed = seed
+
+
+def get_user_name(index):
+    return "user{:05d}".format(index)
+
+
+def get_group_name(index):
+    return "group{:03d}".format(index)
+
+
+class FakeSlackState:
+    """Workspace data and statistics of the fake server."""
+    def __init__(self, config):
+        self.config = config
+        self.lock = threading.Lock()
+        self.random = random.Random(config.seed)
+        self.requests = collections.Counter()
+        self.throttled = collections.Counter()
+        self.uploaded_bytes = 0
+        self.messages = []
+        self.files = {}
+
+        padding = "x" * config.user_payload_bytes
+        self.users = []
+        for index in range(config.users):
+            name = get_user_name(index)
+            self.users.append({
+                "id": "U{:08d}".format(index),
+                "name": name,
+                "deleted": index % 50 == 49,
+                "profile": {
+                    "display_name": "User {}".format(index),
+                    "real_name": "Real User {}".format(index),
+                    "email": "{}@example.com".format(name),
+                    "title": padding,
+                },
+            })
+        self.groups = [
+            {
+                "id": "S{:08d}".format(index),
+                "name": get_group_name(index),
+                "handle": "handle{:03d}".format(index),
+                "date_delete": 0,
+            }
+            for index in range(config.groups)
+        ]
+        self.users_by_email = {
+            user["profile"]["email"]: user
+            for user in self.users
+        }
+
+    def should_throttle(self, method):
+        if not self.config.rate_limit_ratio:
+            return False
+        with self.lock:
+            throttle = self.random.random() < self.config.rate_limit_ratio
+            if throttle:
+                self.throttled[method] += 1
+            return throttle
+
+    def add_request(self, method):
+        with self.lock:
+            self.requests[method] += 1
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                "requests": dict(self.requests),
+                "throttled": dict(self.throttled),
+                "uploaded_bytes": self.uploaded_bytes,
+                "messages": len(self.messages),
+            }
+
+
+class FakeSlackHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def _handle(self):
+        parsed = urllib.parse.urlsplit(self.path)
+        body = self._read_body()
+        if parsed.path.startswith("/upload/"):
+            self._handle_upload(parsed.path.rsplit("/", 1)[-1], body)
+            return
+
+        method = parsed.path.rsplit("/", 1)[-1]
+        params = self._parse_params(parsed.query, body)
+        self.state.add_request(method)
+        if self.state.config.latency:
+            time.sleep(self.state.config.latency)
+
+        if self.state.should_throttle(method):
+            self._send_json(
+                {"ok": False, "error": "ratelimited"},
+                status=429,
+                headers={"Retry-After": str(self.state.config.retry_after)},
+            )
+            return
+
+        handler = getattr(self, "_api_" + method.replace(".", "_"), None)
+        if handler is None:
+            self._send_json({"ok": False, "error": "unknown_method"})
+            return
+        self._send_json(handler(params))
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return b""
+        return self.rfile.read(length)
+
+    def _parse_params(self, query, body):
+        params = {
+            key: values[-1]
+            for key, values in urllib.parse.parse_qs(query).items()
+        }
+        content_type = self.headers.get("Content-Type") or ""
+        if not body:
+            return params
+        if "json" in content_type:
+            params.update(json.loads(body))
+        elif "x-www-form-urlencoded" in content_type:
+            params.update({
+                key: values[-1]
+                for key, values in urllib.parse.parse_qs(
+                    body.decode("utf-8")
+                ).items()
+            })
+        return params
+
+    def _send_json(self, data, status=200, headers=None):
+        content = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _get_page(self, items, params):
+        limit = int(params.get("limit") or self.state.config.max_page_size)
+        limit = max(1, min(limit, self.state.config.max_page_size))
+        start = int(params.get("cursor") or 0)
+        end = start + limit
+        next_cursor = str(end) if end < len(items) else ""
+        return items[start:end], {"next_cursor": next_cursor}
+
+    def _api_auth_test(self, params):
+        return {"ok": True, "user_id": "UBOT", "team_id": "TFAKE"}
+
+    def _api_users_list(self, params):
+        members, metadata = self._get_page(self.state.users, params)
+        return {
+            "ok": True,
+            "members": members,
+            "response_metadata": metadata,
+        }
+
+    def _api_usergroups_list(self, params):
+        # Slack does not page usergroups, cursor support is harmless
+        groups, metadata = self._get_page(self.state.groups, params)
+        return {
+            "ok": True,
+            "usergroups": groups,
+            "response_metadata": metadata,
+        }
+
+    def _api_users_lookupByEmail(self, params):
+        user = self.state.users_by_email.get(params.get("email"))
+        if user is None:
+            return {"ok": False, "error": "users_not_found"}
+        return {"ok": True, "user": user}
+
+    def _api_files_getUploadURLExternal(self, params):
+        with self.state.lock:
+            file_id = "F{:08d}".format(len(self.state.files))
+            self.state.files[file_id] = {
+                "id": file_id,
+                "name": params.get("filename"),
+                "length": int(params.get("length") or 0),
+                "uploaded": False,
+            }
+        host, port = self.server.server_address[:2]
+        return {
+            "ok": True,
+            "file_id": file_id,
+            "upload_url": "http://{}:{}/upload/{}".format(
+                host, port, file_id
+            ),
+        }
+
+    def _handle_upload(self, file_id, body):
+        if self.state.config.upload_latency:
+            time.sleep(self.state.config.upload_latency)
+        with self.state.lock:
+            file_info = self.state.files.get(file_id)
+            if file_info is not None:
+                file_info["uploaded"] = True
+                self.state.uploaded_bytes += len(body)
+        self.send_response(200 if file_info is not None else 404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _api_files_completeUploadExternal(self, params):
+        files = params.get("files") or "[]"
+        if isinstance(files, str):
+            files = json.loads(files)
+        output = []
+        for item in files:
+            file_info = self.state.files.get(item["id"])
+            if file_info is None or not file_info["uploaded"]:
+                return {"ok": False, "error": "file_not_found"}
+            output.append(self._get_file_object(file_info))
+        return {"ok": True, "files": output}
+
+    def _api_files_info(self, params):
+        file_info = self.state.files.get(params.get("file"))
+        if file_info is None:
+            return {"ok": False, "error": "file_not_found"}
+        return {"ok": True, "file": self._get_file_object(file_info)}
+
+    def _get_file_object(self, file_info):
+        return {
+            "id": file_info["id"],
+            "name": file_info["name"],
+            "title": file_info["name"],
+            "size": file_info["length"],
+            "permalink": "https://fake.slack.com/files/{}".format(
+                file_info["id"]
+            ),
+            "shares": {},
+        }
+
+    def _api_chat_postMessage(self, params):
+        with self.state.lock:
+            self.state.messages.append(
+                (params.get("channel"), params.get("text"))
+            )
+            timestamp = "{:.6f}".format(time.time())
+        return {
+            "ok": True,
+            "channel": params.get("channel"),
+            "ts": timestamp,
+        }
+
+
+class FakeSlackServer:
+    """Fake Slack API server running in background thread.
+
+    Args:
+        config (Optional[FakeSlackConfig]): Server behavior.
+        host (str): Host to bind to.
+        port (int): Port to bind to, 0 picks free port.
+    """
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        if config is None:
+            config = FakeSlackConfig()
+        self.state = FakeSlackState(config)
+        self._server = ThreadingHTTPServer((host, port), FakeSlackHandler)
+        self._server.daemon_threads = True
+        self._server.state = self.state
+        self._thread = None
+
+    @property
+    def api_url(self):
+        host, port = self._server.server_address[:2]
+        return "http://{}:{}/api/".format(host, port)
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="FakeSlackServer",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+def add_config_arguments(parser):
+    """Add arguments of 'FakeSlackConfig' to argument parser."""
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--upload-latency", type=float, default=0.0)
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--user-payload-bytes", type=int, default=0)
+    parser.add_argument("--max-page-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def config_from_args(args):
+    return FakeSlackConfig(
+        users=args.users,
+        groups=args.groups,
+        latency=args.latency,
+        upload_latency=args.upload_latency,
+        rate_limit_ratio=args.rate_limit_ratio,
+        retry_after=args.retry_after,
+        user_payload_bytes=args.user_payload_bytes,
+        max_page_size=args.max_page_size,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    server = FakeSlackServer(config_from_args(args), args.host, args.port)
+    print("Fake Slack API listening on {}".format(server.api_url))
+    print("Set AYON_SLACK_API_URL={}".format(server.api_url))
+    server.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.state.get_stats(), indent=4))
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+from .metrics import (
+    SlackMetrics,
+    get_slack_metrics,
+)
+from .scheduler import (
+    TokenBucket,
+    SlackRequestScheduler,
+)
+from .uploads import SlackUploadCache
+from .operations import SlackOperations
+from .directory import (
+    SlackUser,
+    SlackGroup,
+    SlackDirectory,
+)
+from .directory_cache import (
+    SlackDirectoryCache,
+    get_slack_cache_dir,
+)
+from .user_lookup_cache import SlackUserLookupCache
+from .ledger import (
+    SlackDeliveryLedger,
+    get_delivery_key,
+)
+from .clients import (
+    SlackClientRegistry,
+    get_client_registry,
+    close_client_registry,
+)
+from .templates import (
+    CaseVariantsData,
+    CompiledTemplate,
+    normalize_legacy_keys,
+    compile_template,
+)
+from .profiles import SlackProfileMatcher
+from .mentions import (
+    SPECIAL_MENTIONS,
+    has_mentions,
+    get_alias_mentions,
+    translate_mentions,
+)
+from .review_proxy import get_review_proxy
+from .thumbnails import prepare_thumbnail
+from .attachments import (
+    get_thumbnail_path,
+    get_review_path,
+    get_upload_thumbnail,
+    handle_review_upload,
+)
+from .deferred import (
+    get_deferred_dir,
+    get_deferred_instance_key,
+    record_deferred_notification,
+    get_farm_deferred_paths,
+    claim_deferred_record,
+    release_deferred_record,
+    finish_deferred_record,
+    get_deferred_message_key,
+    fill_deferred_review_path,
+    REVIEW_PATH_PLACEHOLDER,
+)
+from .outbox import SlackOutbox
+from .delivery import (
+    deliver_messages,
+    dispatch_to_server,
+    send_messages,
+    add_digest_message,
+    pop_digest_deliveries,
+    merge_channel_deliveries,
+)
+
+
+__all__ = (
+    "SlackMetrics",
+    "get_slack_metrics",
+
+    "TokenBucket",
+    "SlackRequestScheduler",
+
+    "SlackUploadCache",
+    "SlackOperations",
+
+    "SlackUser",
+    "SlackGroup",
+    "SlackDirectory",
+
+    "SlackDirectoryCache",
+    "get_slack_cache_dir",
+
+    "SlackUserLookupCache",
+
+    "SlackDeliveryLedger",
+    "get_delivery_key",
+
+    "SlackClientRegistry",
+    "get_client_registry",
+    "close_client_registry",
+
+    "CaseVariantsData",
+    "CompiledTemplate",
+    "normalize_legacy_keys",
+    "compile_template",
+
+    "SlackProfileMatcher",
+
+    "SPECIAL_MENTIONS",
+    "has_mentions",
+    "get_alias_mentions",
+    "translate_mentions",
+
+    "get_review_proxy",
+    "prepare_thumbnail",
+
+    "get_thumbnail_path",
+    "get_review_path",
+    "get_upload_thumbnail",
+    "handle_review_upload",
+
+    "get_deferred_dir",
+    "get_deferred_instance_key",
+    "record_deferred_notification",
+    "get_farm_deferred_paths",
+    "claim_deferred_record",
+    "release_deferred_record",
+    "finish_deferred_record",
+    "get_deferred_message_key",
+    "fill_deferred_review_path",
+    "REVIEW_PATH_PLACEHOLDER",
+
+    "SlackOutbox",
+
+    "deliver_messages",
+    "dispatch_to_server",
+    "send_messages",
+    "add_digest_message",
+    "pop_digest_deliveries",
+    "merge_channel_deliveries",
+)
@@ -0,0 +1,90 @@
+import os
+
+from .review_proxy import get_review_proxy
+from .thumbnails import prepare_thumbnail
+
+
+def get_thumbnail_path(instance):
+    """Returns abs url for thumbnail if present in instance repres"""
+    from ayon_core.pipeline.publish import get_publish_repre_path
+
+    thumbnail_path = None
+    for repre in instance.data.get("representations", []):
+        if repre.get("thumbnail") or "thumbnail" in repre.get("tags", []):
+            repre_thumbnail_path = get_publish_repre_path(
+                instance, repre, False
+            )
+            if os.path.exists(repre_thumbnail_path):
+                thumbnail_path = repre_thumbnail_path
+            break
+    return thumbnail_path
+
+
+def get_review_path(instance):
+    """Returns abs url for review if present in instance repres"""
+    from ayon_core.pipeline.publish import get_publish_repre_path
+
+    review_path = None
+    for repre in instance.data.get("representations", []):
+        tags = repre.get("tags", [])
+        if (
+            repre.get("review")
+            or "review" in tags
+            or "burnin" in tags
+        ):
+            repre_review_path = get_publish_repre_path(
+                instance, repre, False
+            )
+            if repre_review_path and os.path.exists(repre_review_path):
+                review_path = repre_review_path
+            if "burnin" in tags:  # burnin has precedence if exists
+                break
+    return review_path
+
+
+def get_upload_thumbnail(thumbnail_path, message_profile, log, registry=None):
+    """Thumbnail resized to budget of profile if enabled.
+
+    Result is reused for the whole session if 'registry' is passed.
+    """
+    thumbnail_settings = message_profile.get("thumbnail_budget") or {}
+    if not thumbnail_settings.get("enabled"):
+        return thumbnail_path
+    max_dimension = thumbnail_settings["max_dimension"]
+    max_size = int(thumbnail_settings["max_size"] * 1024)
+    if registry is not None:
+        return registry.get_prepared_thumbnail(
+            thumbnail_path, max_dimension, max_size
+        )
+    return prepare_thumbnail(thumbnail_path, max_dimension, max_size, log)
+
+
+def handle_review_upload(
+    message, message_profile, publish_files, review_path, log
+):
+    """Check if uploaded file is not too large.
+
+    Too large review is replaced by smaller proxy if enabled
+    in profile.
+
+    Returns:
+        tuple[str, set[str]]: Message and files to upload.
+    """
+    review_file_size_MB = os.path.getsize(review_path) / 1024 / 1024
+    file_limit = message_profile.get("review_upload_limit", 50)
+    proxy_settings = message_profile.get("review_proxy") or {}
+    if review_file_size_MB > file_limit and proxy_settings.get("enabled"):
+        proxy_path = get_review_proxy(
+            review_path, proxy_settings, file_limit, log
+        )
+        if proxy_path:
+            publish_files.add(proxy_path)
+            return message, publish_files
+
+    if review_file_size_MB > file_limit:
+        message += "\nReview upload omitted because of file size."
+        if review_path not in message:
+            message += "\nFile located at: {}".format(review_path)
+    else:
+        publish_files.add(review_path)
+    return message, publish_files
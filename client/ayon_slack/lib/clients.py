@@ -0,0 +1,240 @@
+import ssl
+import collections
+import threading
+import weakref
+
+from .operations import SlackOperations
+from .directory_cache import SlackDirectoryCache
+from .user_lookup_cache import SlackUserLookupCache
+from .scheduler import SlackRequestScheduler
+from .metrics import SlackMetrics, get_slack_metrics
+from .ledger import SlackDeliveryLedger
+from .uploads import get_file_key
+from .thumbnails import prepare_thumbnail
+
+CLIENT_REGISTRY_KEY = "__slack_client_registry"
+
+
+def _close_operations(operations_by_token):
+    for operations in operations_by_token.values():
+        operations.close()
+    operations_by_token.clear()
+
+
+class SlackClientRegistry:
+    """Slack clients shared by all instances of one publish session.
+
+    One 'SlackOperations' object is created per token and reused for every
+    instance, message profile and channel, so the client setup and SSL
+    context creation is paid only once per session.
+
+    Registry also holds on-disk caches of workspace users and usergroups,
+    of users found by email and ledger of delivered notifications. Slack
+    mentions of AYON users and thumbnails fitting budget are resolved once
+    per session.
+
+    Clients are released by 'close', which is called at the end of
+    publishing. Registry is also closed on interpreter exit if publishing
+    was interrupted before that.
+
+    Args:
+        log (logging.Logger): Logger passed to created clients.
+        metrics (Optional[SlackMetrics]): Metrics shared by created clients
+            and caches.
+    """
+    def __init__(self, log, metrics=None):
+        if metrics is None:
+            metrics = SlackMetrics()
+        self.log = log
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self._ssl_context = None
+        self._operations_by_token = {}
+        self._directory_caches = {}
+        self._user_lookup_caches = {}
+        self._user_mentions = {}
+        self._prepared_thumbnails = {}
+        self._ledger = None
+        self._finalizer = weakref.finalize(
+            self, _close_operations, self._operations_by_token
+        )
+
+    def get_operations(self, token):
+        """Get shared 'SlackOperations' for token.
+
+        Args:
+            token (str): Slack bot token.
+
+        Returns:
+            SlackOperations: Client wrapper for the token.
+        """
+        with self._lock:
+            operations = self._operations_by_token.get(token)
+            if operations is None:
+                if self._ssl_context is None:
+                    self._ssl_context = ssl.create_default_context()
+                operations = SlackOperations(
+                    token,
+                    self.log,
+                    ssl_context=self._ssl_context,
+                    scheduler=SlackRequestScheduler(
+                        self.log, metrics=self.metrics
+                    ),
+                    metrics=self.metrics,
+                    ledger=self._get_ledger(),
+                )
+                self._operations_by_token[token] = operations
+            return operations
+
+    def get_ledger(self):
+        """Get ledger of delivered notifications and uploaded files.
+
+        Returns:
+            SlackDeliveryLedger: Ledger shared by the session.
+        """
+        with self._lock:
+            return self._get_ledger()
+
+    def _get_ledger(self):
+        if self._ledger is None:
+            self._ledger = SlackDeliveryLedger(log=self.log)
+        return self._ledger
+
+    def get_directory_cache(self, token, ttl):
+        """Get cache of users and usergroups for token.
+
+        Args:
+            token (str): Slack bot token.
+            ttl (float): Time to live of cached data in seconds.
+
+        Returns:
+            SlackDirectoryCache: Directory cache for the token.
+        """
+        with self._lock:
+            cache = self._directory_caches.get(token)
+            if cache is None:
+                cache = SlackDirectoryCache(
+                    token, ttl, self.log, metrics=self.metrics
+                )
+                self._directory_caches[token] = cache
+            return cache
+
+    def get_user_lookup_cache(self, token):
+        """Get cache of Slack users found by email for token.
+
+        Args:
+            token (str): Slack bot token.
+
+        Returns:
+            SlackUserLookupCache: User lookup cache for the token.
+        """
+        with self._lock:
+            cache = self._user_lookup_caches.get(token)
+            if cache is None:
+                cache = SlackUserLookupCache(
+                    token, self.log, metrics=self.metrics
+                )
+                self._user_lookup_caches[token] = cache
+            return cache
+
+    def get_user_mention(self, token, username, resolve_func):
+        """Get Slack mention of AYON user, resolved once per session.
+
+        Args:
+            token (str): Slack bot token.
+            username (str): AYON username.
+            resolve_func (Callable[[], str]): Returns mention of the user.
+                Called only on first request of the user.
+
+        Returns:
+            str: Slack mention of the user.
+        """
+        key = (token, username)
+        with self._lock:
+            mention = self._user_mentions.get(key)
+        if mention is None:
+            mention = resolve_func()
+            with self._lock:
+                mention = self._user_mentions.setdefault(key, mention)
+        return mention
+
+    def get_prepared_thumbnail(self, path, max_dimension, max_size):
+        """Get thumbnail fitting budget, prepared once per session.
+
+        Args:
+            path (str): Path to thumbnail.
+            max_dimension (int): Maximum width and height in pixels.
+            max_size (int): Maximum file size in bytes.
+
+        Returns:
+            str: Path to thumbnail which should be uploaded.
+        """
+        key = (get_file_key(path), max_dimension, max_size)
+        with self._lock:
+            output_path = self._prepared_thumbnails.get(key)
+        if output_path is None:
+            output_path = prepare_thumbnail(
+                path, max_dimension, max_size, self.log
+            )
+            with self._lock:
+                output_path = self._prepared_thumbnails.setdefault(
+                    key, output_path
+                )
+        return output_path
+
+    def get_counters(self):
+        """Request scheduler statistics summed for all clients.
+
+        Returns:
+            dict[str, Union[int, float]]: Statistics of Slack requests.
+        """
+        counters = collections.Counter()
+        with self._lock:
+            operations = tuple(self._operations_by_token.values())
+        for item in operations:
+            counters.update(item.scheduler.get_counters())
+        return dict(counters)
+
+    def close(self):
+        """Close all clients created by the registry.
+
+        Background refresh of directory caches uses its own client, it is
+        not waited for.
+        """
+        with self._lock:
+            self._directory_caches.clear()
+            self._user_lookup_caches.clear()
+            self._user_mentions.clear()
+            self._prepared_thumbnails.clear()
+            self._finalizer()
+            self._ssl_context = None
+
+
+def get_client_registry(context, log):
+    """Get client registry stored on publish context.
+
+    Registry is created on first call.
+
+    Args:
+        context (pyblish.api.Context): Publish context.
+        log (logging.Logger): Logger used if registry is created.
+
+    Returns:
+        SlackClientRegistry: Registry shared by the publish session.
+    """
+    registry = context.data.get(CLIENT_REGISTRY_KEY)
+    if registry is None:
+        registry = SlackClientRegistry(log, get_slack_metrics(context))
+        context.data[CLIENT_REGISTRY_KEY] = registry
+    return registry
+
+
+def close_client_registry(context):
+    """Close and remove client registry from publish context.
+
+    Args:
+        context (pyblish.api.Context): Publish context.
+    """
+    registry = context.data.pop(CLIENT_REGISTRY_KEY, None)
+    if registry is not None:
+        registry.close()
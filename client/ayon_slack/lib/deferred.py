@@ -0,0 +1,212 @@
+import os
+import json
+import time
+import hashlib
+
+# Notifications of farm instances stored next to publish job metadata
+DEFERRED_FILENAME = "slack_deferred.json"
+DEFERRED_FORMAT_VERSION = 1
+# Suffixes of claimed and processed records
+CLAIMED_SUFFIX = ".sending"
+SENT_SUFFIX = ".sent"
+# Claimed records older than this are considered abandoned (seconds)
+CLAIM_TIMEOUT = 60 * 60
+# Environment variable with metadata paths of farm publish job
+PUBLISH_DATA_ENV = "AYON_PUBLISH_DATA"
+# Review does not exist when farm instance is submitted, placeholder is kept
+#   in stored message and filled by publish job
+REVIEW_PATH_PLACEHOLDER = "{review_filepath}"
+
+
+def get_deferred_dir(instance):
+    """Directory shared by farm instance and its publish job.
+
+    Publish job metadata are stored in this directory, so it is available
+    on the farm before publish job starts.
+
+    Args:
+        instance (pyblish.api.Instance): Instance submitted to farm.
+
+    Returns:
+        Union[str, None]: Directory or None if it is not known.
+    """
+    return (
+        instance.data.get("publishRenderMetadataFolder")
+        or instance.data.get("outputDir")
+    )
+
+
+def get_deferred_instance_key(instance):
+    """Key matching farm instance with instances of publish job."""
+    return "{}/{}".format(
+        instance.data.get("folderPath"), instance.data["productName"]
+    )
+
+
+def record_deferred_notification(
+    directory,
+    project_name,
+    instance_key,
+    message_profiles,
+    delivery_settings,
+):
+    """Store rendered notification of farm instance.
+
+    Records of all instances sharing the directory are stored in one file,
+    so publish job sends them in one message per channel.
+
+    Args:
+        directory (str): Directory from 'get_deferred_dir'.
+        project_name (str): Project name.
+        instance_key (str): Key from 'get_deferred_instance_key'.
+        message_profiles (list[dict[str, Any]]): Rendered messages, their
+            channels and upload settings.
+        delivery_settings (dict[str, Any]): 'delivery_mode' and 'workers'.
+
+    Returns:
+        str: Path to record file.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, DEFERRED_FILENAME)
+    data = _read_record(path) or {
+        "version": DEFERRED_FORMAT_VERSION,
+        "project_name": project_name,
+        "instances": {},
+    }
+    data["delivery_settings"] = delivery_settings
+    data["instances"][instance_key] = message_profiles
+    _write_record(path, data)
+    return path
+
+
+def fill_deferred_review_path(message, review_path):
+    """Fill review path placeholder kept in stored message.
+
+    Args:
+        message (str): Stored message.
+        review_path (Union[str, None]): Path to published review.
+
+    Returns:
+        str: Message with review path, placeholder is removed if there
+            is no review.
+    """
+    return message.replace(REVIEW_PATH_PLACEHOLDER, review_path or "")
+
+
+def get_farm_deferred_paths(context):
+    """Paths of records related to running farm publish job.
+
+    Args:
+        context (pyblish.api.Context): Publish context.
+
+    Returns:
+        list[str]: Paths to records, including claimed and sent.
+    """
+    metadata_paths = os.environ.get(PUBLISH_DATA_ENV)
+    if not metadata_paths:
+        return []
+
+    anatomy = context.data.get("anatomy")
+    output = []
+    for metadata_path in metadata_paths.split(os.pathsep):
+        if not metadata_path:
+            continue
+        if anatomy is not None and "{root" in metadata_path:
+            metadata_path = anatomy.fill_root(metadata_path)
+        path = os.path.join(
+            os.path.dirname(metadata_path), DEFERRED_FILENAME
+        )
+        if path in output:
+            continue
+        for suffix in ("", CLAIMED_SUFFIX, SENT_SUFFIX):
+            if os.path.exists(path + suffix):
+                output.append(path)
+                break
+    return output
+
+
+def claim_deferred_record(path):
+    """Claim record so it is sent only once.
+
+    Record claimed by publish job which crashed is claimed again after
+    'CLAIM_TIMEOUT', so requeued publish job can send it.
+
+    Args:
+        path (str): Path to record.
+
+    Returns:
+        Union[tuple[str, dict[str, Any]], None]: Path to claimed record and
+            its data, or None if record was already claimed or sent.
+    """
+    claimed_path = path + CLAIMED_SUFFIX
+    try:
+        os.replace(path, claimed_path)
+    except OSError:
+        if not _is_stale_claim(claimed_path):
+            return None
+    # Claim time is used to detect abandoned records
+    os.utime(claimed_path)
+
+    data = _read_record(claimed_path)
+    if data is None:
+        # Invalid record would be claimed again and again
+        finish_deferred_record(claimed_path)
+        return None
+    return claimed_path, data
+
+
+def release_deferred_record(claimed_path, data):
+    """Return claimed record which was not sent, so it can be retried.
+
+    Args:
+        claimed_path (str): Path to claimed record.
+        data (dict[str, Any]): Record data with marked sent messages.
+    """
+    _write_record(claimed_path, data)
+    os.replace(claimed_path, claimed_path[:-len(CLAIMED_SUFFIX)])
+
+
+def finish_deferred_record(claimed_path):
+    """Mark claimed record as sent."""
+    os.replace(
+        claimed_path,
+        claimed_path[:-len(CLAIMED_SUFFIX)] + SENT_SUFFIX
+    )
+
+
+def get_deferred_message_key(channel, message):
+    """Key of sent message stored in record, so retry does not resend it."""
+    return hashlib.sha1(
+        "{}\0{}".format(channel, message).encode("utf-8")
+    ).hexdigest()
+
+
+def _is_stale_claim(claimed_path):
+    try:
+        mtime = os.path.getmtime(claimed_path)
+    except OSError:
+        return False
+    return mtime < time.time() - CLAIM_TIMEOUT
+
+
+def _read_record(path):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as stream:
+            data = json.load(stream)
+    except (OSError, ValueError):
+        return None
+    if (
+        not isinstance(data, dict)
+        or data.get("version") != DEFERRED_FORMAT_VERSION
+    ):
+        return None
+    return data
+
+
+def _write_record(path, data):
+    tmp_path = "{}.{}.tmp".format(path, os.getpid())
+    with open(tmp_path, "w") as stream:
+        json.dump(data, stream, indent=4)
+    os.replace(tmp_path, path)
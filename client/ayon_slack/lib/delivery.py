@@ -0,0 +1,257 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from .outbox import SlackOutbox
+
+SLACK_NOTIFY_TOPIC = "slack.notify"
+# Context data key of messages collected for digest
+SLACK_DIGEST_KEY = "__slack_digest"
+# Slack truncates messages longer than 40 000 characters
+MAX_DIGEST_LENGTH = 35000
+
+
+def deliver_messages(
+    client,
+    deliveries,
+    project_name,
+    log,
+    delivery_mode="direct",
+    workers=1,
+):
+    """Deliver rendered messages using configured delivery mode.
+
+    Args:
+        client (SlackOperations): Slack client.
+        deliveries (list[tuple[str, str, list[str]]]): Channel, message
+            and files to upload.
+        project_name (str): Project name.
+        log (logging.Logger): Logger.
+        delivery_mode (str): 'direct', 'outbox' or 'server'.
+        workers (int): Maximum number of channels processed at once
+            in 'direct' mode.
+
+    Returns:
+        list[bool]: Delivery was sent, or accepted by outbox or server,
+            in order of passed deliveries.
+    """
+    if not deliveries:
+        return []
+
+    if delivery_mode == "outbox":
+        SlackOutbox(log=log).enqueue(project_name, deliveries)
+        log.info("Slack notification was stored to outbox.")
+        return [True] * len(deliveries)
+
+    if delivery_mode == "server":
+        return dispatch_to_server(client, deliveries, project_name, log)
+
+    return send_messages(client, deliveries, workers)
+
+
+def dispatch_to_server(client, deliveries, project_name, log):
+    """Upload files and let AYON server post the messages.
+
+    Messages with files which failed to upload are not dispatched. Errors
+    are logged, not raised.
+
+    Args:
+        client (SlackOperations): Slack client used for uploads.
+        deliveries (list[tuple[str, str, list[str]]]): Channel, message
+            and files to upload.
+        project_name (str): Project name.
+        log (logging.Logger): Logger.
+
+    Returns:
+        list[bool]: Message was dispatched, in order of passed deliveries.
+    """
+    import ayon_api
+
+    results = [False] * len(deliveries)
+    payload_deliveries = []
+    for index, (channel, message, publish_files) in enumerate(deliveries):
+        try:
+            message = client.prepare_message(message, publish_files)
+        except Exception:
+            log.warning(
+                "Failed to upload files for channel '{}'".format(channel),
+                exc_info=True
+            )
+            continue
+        results[index] = True
+        payload_deliveries.append({
+            "channel": channel,
+            "message": message,
+        })
+
+    if not payload_deliveries:
+        return results
+
+    try:
+        ayon_api.dispatch_event(
+            SLACK_NOTIFY_TOPIC,
+            sender="ayon_slack",
+            project_name=project_name,
+            description="Slack notification",
+            summary={
+                "channels": [item["channel"] for item in payload_deliveries]
+            },
+            payload={"deliveries": payload_deliveries},
+            finished=False,
+        )
+    except Exception:
+        log.warning(
+            "Failed to dispatch Slack notification to AYON server.",
+            exc_info=True
+        )
+        return [False] * len(deliveries)
+
+    log.info("Slack notification was dispatched to AYON server.")
+    return results
+
+
+def send_messages(client, deliveries, workers=1):
+    """Send messages to channels.
+
+    Messages for different channels are sent in parallel if 'workers'
+    is higher than 1. Messages for the same channel are always sent
+    in order.
+
+    Args:
+        client (SlackOperations): Slack client.
+        deliveries (list[tuple[str, str, list[str]]]): Channel, message
+            and files to upload.
+        workers (int): Maximum number of channels processed at once.
+
+    Returns:
+        list[bool]: Message was sent, in order of passed deliveries.
+    """
+    results = [False] * len(deliveries)
+    messages_by_channel = {}
+    for index, (channel, message, publish_files) in enumerate(deliveries):
+        messages_by_channel.setdefault(channel, []).append(
+            (index, message, publish_files)
+        )
+
+    workers = min(workers, len(messages_by_channel))
+    if workers < 2:
+        for channel, messages in messages_by_channel.items():
+            _send_channel_messages(client, channel, messages, results)
+        return results
+
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="SlackDelivery"
+    ) as executor:
+        futures = [
+            executor.submit(
+                _send_channel_messages, client, channel, messages, results
+            )
+            for channel, messages in messages_by_channel.items()
+        ]
+        for future in futures:
+            future.result()
+    return results
+
+
+def _send_channel_messages(client, channel, messages, results):
+    for index, message, publish_files in messages:
+        results[index] = client.send_message(
+            channel, message, publish_files
+        )
+
+
+def add_digest_message(
+    context, token, channel, message, publish_files, delivery_settings
+):
+    """Collect message to be sent in one digest message per channel.
+
+    Args:
+        context (pyblish.api.Context): Publish context.
+        token (str): Slack token.
+        channel (str): Target channel.
+        message (str): Rendered message.
+        publish_files (list[str]): Files to upload.
+        delivery_settings (dict[str, Any]): 'delivery_mode' and 'workers'
+            used to send the digest.
+    """
+    digest = context.data.setdefault(SLACK_DIGEST_KEY, {})
+    token_digest = digest.setdefault(token, {
+        "delivery_settings": delivery_settings,
+        "messages_by_channel": {},
+    })
+    token_digest["messages_by_channel"].setdefault(channel, []).append(
+        (message, publish_files)
+    )
+
+
+def pop_digest_deliveries(context):
+    """Get digest deliveries collected during publishing.
+
+    Messages of one channel are merged into one message, or more if the
+    result would be too long for Slack.
+
+    Args:
+        context (pyblish.api.Context): Publish context.
+
+    Returns:
+        list[tuple[str, dict[str, Any], list[tuple[str, str, list[str]]]]]:
+            Token, delivery settings and deliveries.
+    """
+    output = []
+    digest = context.data.pop(SLACK_DIGEST_KEY, None) or {}
+    for token, token_digest in digest.items():
+        deliveries = []
+        messages_by_channel = token_digest["messages_by_channel"]
+        for channel, messages in messages_by_channel.items():
+            for message, publish_files in _merge_messages(messages):
+                deliveries.append((channel, message, publish_files))
+        output.append(
+            (token, token_digest["delivery_settings"], deliveries)
+        )
+    return output
+
+
+def merge_channel_deliveries(deliveries):
+    """Merge messages of each channel into one message.
+
+    Messages are split into more messages if the result would be too long
+    for Slack.
+
+    Args:
+        deliveries (list[tuple[str, str, list[str]]]): Channel, message
+            and files to upload.
+
+    Returns:
+        list[tuple[str, str, list[str]]]: Merged deliveries.
+    """
+    messages_by_channel = {}
+    for channel, message, publish_files in deliveries:
+        messages_by_channel.setdefault(channel, []).append(
+            (message, publish_files)
+        )
+
+    output = []
+    for channel, messages in messages_by_channel.items():
+        for message, publish_files in _merge_messages(messages):
+            output.append((channel, message, publish_files))
+    return output
+
+
+def _merge_messages(messages):
+    merged = []
+    lines = []
+    publish_files = []
+    length = 0
+    for message, message_files in messages:
+        if lines and length + len(message) > MAX_DIGEST_LENGTH:
+            merged.append(("\n".join(lines), publish_files))
+            lines = []
+            publish_files = []
+            length = 0
+        lines.append(message)
+        length += len(message) + 1
+        for path in message_files:
+            if path not in publish_files:
+                publish_files.append(path)
+
+    if lines:
+        merged.append(("\n".join(lines), publish_files))
+    return merged
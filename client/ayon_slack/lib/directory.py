@@ -0,0 +1,161 @@
+class SlackUser:
+    """Slack user record used for mention resolution."""
+    __slots__ = ("id", "name", "display_name", "real_name")
+
+    def __init__(self, user_id, name, display_name, real_name):
+        self.id = user_id
+        self.name = name
+        self.display_name = display_name
+        self.real_name = real_name
+
+    def __repr__(self):
+        return "<{} {} '{}'>".format(
+            self.__class__.__name__, self.id, self.name
+        )
+
+
+class SlackGroup:
+    """Slack usergroup record used for mention resolution."""
+    __slots__ = ("id", "name", "handle")
+
+    def __init__(self, group_id, name, handle):
+        self.id = group_id
+        self.name = name
+        self.handle = handle
+
+    def __repr__(self):
+        return "<{} {} '{}'>".format(
+            self.__class__.__name__, self.id, self.handle
+        )
+
+
+class SlackDirectory:
+    """Users and usergroups of Slack workspace indexed by their names.
+
+    User can be found by 'name', 'profile.display_name' or
+    'profile.real_name', usergroup by 'handle' or 'name'. Lookup is case
+    insensitive. If more users match the same name, the one added first
+    is used.
+
+    Deleted users and usergroups are skipped.
+    """
+    def __init__(self):
+        self._users = []
+        self._groups = []
+        self._users_by_name = {}
+        self._groups_by_name = {}
+
+    @classmethod
+    def from_payload(cls, users, groups):
+        """Create directory from 'users.list' and 'usergroups.list' items.
+
+        Args:
+            users (Iterable[dict]): Slack user objects.
+            groups (Iterable[dict]): Slack usergroup objects.
+
+        Returns:
+            SlackDirectory: Directory with all users and groups.
+        """
+        directory = cls()
+        directory.add_users(users)
+        directory.add_groups(groups)
+        return directory
+
+    def to_payload(self):
+        """Convert directory to minimal Slack-like objects.
+
+        Output can be passed to 'from_payload' to recreate the directory.
+
+        Returns:
+            tuple[list[dict], list[dict]]: Users and usergroups.
+        """
+        users = [
+            {
+                "id": user.id,
+                "name": user.name,
+                "profile": {
+                    "display_name": user.display_name,
+                    "real_name": user.real_name,
+                },
+            }
+            for user in self._users
+        ]
+        groups = [
+            {
+                "id": group.id,
+                "name": group.name,
+                "handle": group.handle,
+            }
+            for group in self._groups
+        ]
+        return users, groups
+
+    def add_users(self, users):
+        """Add Slack user objects to the directory.
+
+        Args:
+            users (Iterable[dict]): Slack user objects.
+        """
+        users_by_name = self._users_by_name
+        for user in users:
+            if user.get("deleted"):
+                continue
+            profile = user.get("profile") or {}
+            record = SlackUser(
+                user["id"],
+                user.get("name") or "",
+                profile.get("display_name") or "",
+                profile.get("real_name") or "",
+            )
+            self._users.append(record)
+            for name in (record.name, record.display_name, record.real_name):
+                if name:
+                    users_by_name.setdefault(name.casefold(), record)
+
+    def add_groups(self, groups):
+        """Add Slack usergroup objects to the directory.
+
+        Args:
+            groups (Iterable[dict]): Slack usergroup objects.
+        """
+        groups_by_name = self._groups_by_name
+        for group in groups:
+            if group.get("date_delete"):
+                continue
+            record = SlackGroup(
+                group["id"],
+                group.get("name") or "",
+                group.get("handle") or "",
+            )
+            self._groups.append(record)
+            for name in (record.name, record.handle):
+                if name:
+                    groups_by_name.setdefault(name.casefold(), record)
+
+    def get_user_id(self, name):
+        """Slack id of user by name.
+
+        Args:
+            name (str): User name, display name or real name.
+
+        Returns:
+            Union[str, None]: Slack user id or None if not found.
+        """
+        user = self._users_by_name.get(name.casefold())
+        if user is None:
+            return None
+        return user.id
+
+    def get_group_id(self, name):
+        """Slack id of usergroup by name.
+
+        Args:
+            name (str): Usergroup handle or name.
+
+        Returns:
+            Union[str, None]: Slack usergroup id or None if not found.
+        """
+        group = self._groups_by_name.get(name.casefold())
+        if group is None:
+            return None
+        return group.id
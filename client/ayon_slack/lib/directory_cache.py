@@ -0,0 +1,217 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+from .directory import SlackDirectory
+from .metrics import SlackMetrics
+
+CACHE_FORMAT_VERSION = 2
+
+
+def get_slack_cache_dir(*subdirs):
+    """Directory where Slack addon stores local cache files.
+
+    Args:
+        *subdirs (str): Subdirectories joined to the cache directory.
+
+    Returns:
+        str: Path to existing directory.
+    """
+    try:
+        from ayon_core.lib import get_launcher_local_dir
+    except ImportError:
+        # Older ayon-core
+        from ayon_core.lib import get_ayon_appdirs as get_launcher_local_dir
+
+    path = get_launcher_local_dir("addons", "slack", *subdirs)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def get_token_hash(token):
+    """Short stable hash of token which is safe to store on disk."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
+
+
+# Paths of cache files which are being refreshed in this process
+_REFRESHING_PATHS = set()
+_REFRESHING_LOCK = threading.Lock()
+
+
+class SlackDirectoryCache:
+    """Users and usergroups of Slack workspace cached on disk.
+
+    Bot token is bound to a single workspace, so cache file is keyed by hash
+    of the token. Only fields needed for mention resolution
+    of users and usergroups which are not deleted are stored.
+
+    Cached data are used without any request to Slack until they are older
+    than 'ttl'. Expired data are still returned and refreshed in background
+    thread so mention resolution does not wait for Slack. Data are downloaded
+    synchronously only if there is no cache file yet.
+
+    Background refresh uses its own client, so it is not affected by end
+    of publishing, and publishing does not wait for it. Only one refresh
+    of a cache file runs in a process at a time.
+
+    Args:
+        token (str): Slack bot token.
+        ttl (float): Time to live of cached data in seconds. Value '0'
+            disables the disk cache.
+        log (logging.Logger): Logger.
+        cache_dir (Optional[str]): Directory of the cache file.
+        metrics (Optional[SlackMetrics]): Metrics where cache hits
+            are counted.
+    """
+    def __init__(self, token, ttl, log, cache_dir=None, metrics=None):
+        if cache_dir is None:
+            cache_dir = get_slack_cache_dir("directory")
+        if metrics is None:
+            metrics = SlackMetrics()
+        self.ttl = ttl
+        self.log = log
+        self._token = token
+        self.metrics = metrics
+        self.path = os.path.join(
+            cache_dir, "{}.json".format(get_token_hash(token))
+        )
+        self._lock = threading.Lock()
+        self._directory = None
+        self._refresh_thread = None
+
+    def get_directory(self, operations):
+        """Get users and usergroups of workspace.
+
+        Directory is built only once and reused for following calls.
+
+        Args:
+            operations (SlackOperations): Client used to download data
+                if cache is missing or expired.
+
+        Returns:
+            SlackDirectory: Indexed users and usergroups.
+        """
+        with self._lock:
+            if self._directory is not None:
+                self.metrics.increment("cache.directory.hits")
+                return self._directory
+
+            data = None
+            if self.ttl > 0:
+                data = self._read()
+
+            if data is None:
+                self.metrics.increment("cache.directory.misses")
+                directory = operations.get_directory()
+                self._store(directory)
+
+            else:
+                self.metrics.increment("cache.directory.hits")
+                directory = SlackDirectory.from_payload(
+                    data["users"], data["groups"]
+                )
+                if time.time() - data["updated"] > self.ttl:
+                    self._start_refresh()
+
+            self._directory = directory
+            return directory
+
+    def wait(self, timeout=None):
+        """Wait for running background refresh to finish."""
+        thread = self._refresh_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _start_refresh(self):
+        if self._refresh_thread is not None:
+            return
+        with _REFRESHING_LOCK:
+            if self.path in _REFRESHING_PATHS:
+                return
+            _REFRESHING_PATHS.add(self.path)
+        self.log.debug("Refreshing Slack directory cache in background.")
+        self._refresh_thread = threading.Thread(
+            target=self._refresh,
+            name="SlackDirectoryRefresh",
+            daemon=True,
+        )
+        self._refresh_thread.start()
+
+    def _refresh(self):
+        from .operations import SlackOperations
+
+        try:
+            operations = SlackOperations(
+                self._token, self.log, metrics=self.metrics
+            )
+            try:
+                directory = operations.get_directory()
+            finally:
+                operations.close()
+
+            if not self._store(directory):
+                self.log.warning(
+                    "Failed to refresh Slack directory cache '{}'. Expired"
+                    " users and usergroups are used.".format(self.path)
+                )
+        except Exception:
+            self.log.warning(
+                "Failed to refresh Slack directory cache '{}'. Expired"
+                " users and usergroups are used.".format(self.path),
+                exc_info=True
+            )
+        finally:
+            with _REFRESHING_LOCK:
+                _REFRESHING_PATHS.discard(self.path)
+
+    def _store(self, directory):
+        """Store downloaded directory.
+
+        Returns:
+            bool: Directory was stored.
+        """
+        users, groups = directory.to_payload()
+        # Do not overwrite valid cache with result of failed download
+        if self.ttl <= 0 or not (users or groups):
+            return False
+        return self._write({
+            "version": CACHE_FORMAT_VERSION,
+            "updated": time.time(),
+            "users": users,
+            "groups": groups,
+        })
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "r") as stream:
+                data = json.load(stream)
+        except Exception:
+            self.log.debug(
+                "Failed to read Slack directory cache '%s'.",
+                self.path, exc_info=True
+            )
+            return None
+
+        if data.get("version") != CACHE_FORMAT_VERSION:
+            return None
+        return data
+
+    def _write(self, data):
+        tmp_path = "{}.{}.tmp".format(self.path, os.getpid())
+        try:
+            with open(tmp_path, "w") as stream:
+                json.dump(data, stream, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+            return True
+        except Exception:
+            self.log.debug(
+                "Failed to write Slack directory cache '%s'.",
+                self.path, exc_info=True
+            )
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
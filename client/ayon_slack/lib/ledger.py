@@ -0,0 +1,183 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+
+from .directory_cache import get_slack_cache_dir
+
+LEDGER_FILENAME = "ledger.sqlite"
+# Records older than this are removed when ledger is opened
+LEDGER_RETENTION = 90 * 24 * 60 * 60
+
+
+def get_delivery_key(version_id, profile_key, channel, message, files):
+    """Key identifying one notification of published version.
+
+    Args:
+        version_id (str): Id of published version.
+        profile_key (str): Identifier of message profile.
+        channel (str): Target channel.
+        message (str): Rendered message.
+        files (Iterable[str]): Files attached to message.
+
+    Returns:
+        str: Delivery key.
+    """
+    content_hash = hashlib.sha256(message.encode("utf-8"))
+    for path in sorted(files):
+        content_hash.update(b"\0")
+        content_hash.update(os.path.basename(path).encode("utf-8"))
+    return hashlib.sha256(
+        "\0".join((
+            version_id, profile_key, channel, content_hash.hexdigest()
+        )).encode("utf-8")
+    ).hexdigest()
+
+
+class SlackDeliveryLedger:
+    """Delivered notifications and uploaded files stored in local SQLite.
+
+    Ledger is checked before sending, so retried publish, or rerun of the
+    same publish, does not post notification which was already delivered.
+    Permalinks of uploaded files are stored per workspace and reused
+    instead of uploading the same file again.
+
+    Args:
+        path (Optional[str]): Path to SQLite database.
+        log (Optional[logging.Logger]): Logger.
+    """
+    def __init__(self, path=None, log=None):
+        if path is None:
+            path = os.path.join(get_slack_cache_dir(), LEDGER_FILENAME)
+        self.path = path
+        self.log = log
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def is_delivered(self, delivery_key):
+        """Notification with the key was already delivered.
+
+        Args:
+            delivery_key (str): Key from 'get_delivery_key'.
+
+        Returns:
+            bool: Notification was delivered.
+        """
+        row = self._fetch_one(
+            "SELECT 1 FROM deliveries WHERE key = ?", (delivery_key, )
+        )
+        return row is not None
+
+    def add_delivery(self, delivery_key, channel):
+        """Record delivered notification.
+
+        Args:
+            delivery_key (str): Key from 'get_delivery_key'.
+            channel (str): Target channel.
+        """
+        self._execute(
+            "INSERT OR REPLACE INTO deliveries (key, channel, created)"
+            " VALUES (?, ?, ?)",
+            (delivery_key, channel, time.time())
+        )
+
+    def get_permalink(self, workspace_key, file_key):
+        """Permalink of file uploaded to workspace.
+
+        Args:
+            workspace_key (str): Hash of token.
+            file_key (tuple[str, int, int]): Key from 'get_file_key'.
+
+        Returns:
+            Union[str, None]: Permalink or None.
+        """
+        row = self._fetch_one(
+            "SELECT permalink FROM permalinks"
+            " WHERE workspace = ? AND file_key = ?",
+            (workspace_key, _serialize_file_key(file_key))
+        )
+        if row is None:
+            return None
+        return row[0]
+
+    def add_permalink(self, workspace_key, file_key, permalink):
+        """Record permalink of uploaded file.
+
+        Args:
+            workspace_key (str): Hash of token.
+            file_key (tuple[str, int, int]): Key from 'get_file_key'.
+            permalink (str): Permalink of uploaded file.
+        """
+        self._execute(
+            "INSERT OR REPLACE INTO permalinks"
+            " (workspace, file_key, permalink, created) VALUES (?, ?, ?, ?)",
+            (
+                workspace_key,
+                _serialize_file_key(file_key),
+                permalink,
+                time.time(),
+            )
+        )
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=10)
+        if not self._initialized:
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS deliveries ("
+                    " key TEXT PRIMARY KEY,"
+                    " channel TEXT,"
+                    " created REAL)"
+                )
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS permalinks ("
+                    " workspace TEXT,"
+                    " file_key TEXT,"
+                    " permalink TEXT,"
+                    " created REAL,"
+                    " PRIMARY KEY (workspace, file_key))"
+                )
+                limit = time.time() - LEDGER_RETENTION
+                for table in ("deliveries", "permalinks"):
+                    connection.execute(
+                        "DELETE FROM {} WHERE created < ?".format(table),
+                        (limit, )
+                    )
+            self._initialized = True
+        return connection
+
+    def _fetch_one(self, query, args):
+        try:
+            with self._lock:
+                connection = self._connect()
+                try:
+                    return connection.execute(query, args).fetchone()
+                finally:
+                    connection.close()
+        except sqlite3.Error:
+            self._log_error()
+            return None
+
+    def _execute(self, query, args):
+        try:
+            with self._lock:
+                connection = self._connect()
+                try:
+                    with connection:
+                        connection.execute(query, args)
+                finally:
+                    connection.close()
+        except sqlite3.Error:
+            self._log_error()
+
+    def _log_error(self):
+        if self.log is not None:
+            self.log.debug(
+                "Slack delivery ledger '%s' is not available.",
+                self.path, exc_info=True
+            )
+
+
+def _serialize_file_key(file_key):
+    return "\0".join(str(item) for item in file_key)
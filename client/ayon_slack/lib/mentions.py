@@ -0,0 +1,124 @@
+import re
+
+# Quoted mention '"@John Doe"' or bare mention '@john', '@' preceded
+#   by word character is part of email address
+_MENTION_REGEX = re.compile(
+    r"(?<![<\w.+-])"
+    r"(?:(?P<quote>['\"])@(?P<quoted>[^'\"]+)|@(?P<bare>\S+))"
+)
+# Mentions which are handled by Slack itself
+SPECIAL_MENTIONS = {
+    "here": "<!here>",
+    "channel": "<!channel>",
+    "everyone": "<!everyone>",
+}
+# Characters stripped from end of bare mention which was not resolved,
+#   e.g. '@john,' or '@john.'
+_TRAILING_CHARS = ".,;:!?)]}'\""
+
+
+def has_mentions(message):
+    """Message contains text which looks like mention.
+
+    Args:
+        message (str): Message text.
+
+    Returns:
+        bool: Message contains mention.
+    """
+    return "@" in message and _MENTION_REGEX.search(message) is not None
+
+
+def get_alias_mentions(user_aliases, group_aliases):
+    """Slack mentions of names defined in settings.
+
+    Args:
+        user_aliases (Iterable[dict[str, str]]): Items with 'name'
+            and Slack user id in 'slack_id'.
+        group_aliases (Iterable[dict[str, str]]): Items with 'name'
+            and Slack usergroup id in 'slack_id'.
+
+    Returns:
+        dict[str, str]: Slack mention by case folded name.
+    """
+    output = {}
+    for aliases, mention_template in (
+        (group_aliases, "<!subteam^{}>"),
+        (user_aliases, "<@{}>"),
+    ):
+        for item in aliases or []:
+            name = (item.get("name") or "").strip()
+            slack_id = (item.get("slack_id") or "").strip()
+            if name and slack_id:
+                output[name.casefold()] = mention_template.format(slack_id)
+    return output
+
+
+def translate_mentions(message, resolve_func):
+    """Replace @mentions in message with Slack mention syntax.
+
+    Message is scanned once. Each distinct name is resolved only once
+    and output is joined at the end. Quoted mentions ('"@John Doe"') can
+    contain spaces, quoted text which is not a name is scanned again
+    for bare mentions. Bare mention which cannot be resolved is resolved again
+    without trailing punctuation, so '@john,' is translated as '@john'
+    followed by ','.
+
+    Args:
+        message (str): Message text.
+        resolve_func (Callable[[str], Union[str, None]]): Function returning
+            Slack mention (e.g. '<@U123>') for a name or None.
+
+    Returns:
+        str: Message with translated mentions.
+    """
+    resolved = {}
+
+    def _resolve(name):
+        if name not in resolved:
+            resolved[name] = resolve_func(name)
+        return resolved[name]
+
+    parts = []
+    position = 0
+    search_position = 0
+    while True:
+        match = _MENTION_REGEX.search(message, search_position)
+        if match is None:
+            break
+        search_position = match.end()
+        quote = match.group("quote")
+        if quote:
+            mention = _resolve(match.group("quoted"))
+            if mention is None:
+                # Quoted text is not a name, e.g. '"@john fixed it"', scan
+                #   it again for bare mentions
+                search_position = match.start() + 1
+                continue
+            parts.append(message[position:match.start()])
+            parts.append(quote)
+            parts.append(mention)
+            position = match.end()
+            continue
+
+        name = match.group("bare")
+        mention = _resolve(name)
+        suffix = ""
+        if mention is None:
+            stripped = name.rstrip(_TRAILING_CHARS)
+            if not stripped or stripped == name:
+                continue
+            mention = _resolve(stripped)
+            if mention is None:
+                continue
+            suffix = name[len(stripped):]
+
+        parts.append(message[position:match.start()])
+        parts.append(mention)
+        parts.append(suffix)
+        position = match.end()
+
+    if not parts:
+        return message
+    parts.append(message[position:])
+    return "".join(parts)
@@ -0,0 +1,200 @@
+import os
+import re
+import json
+import time
+import threading
+import contextlib
+
+METRICS_KEY = "slackMetrics"
+# Path where metrics of publish session are exported, '.prom' extension
+#   exports Prometheus text format, anything else JSON
+METRICS_PATH_ENV = "AYON_SLACK_METRICS_PATH"
+# Counters with these suffixes are used to compute cache hit ratios
+_HITS_SUFFIX = ".hits"
+_MISSES_SUFFIX = ".misses"
+_PROMETHEUS_NAME_REGEX = re.compile(r"[^a-zA-Z0-9_]")
+
+
+class SlackMetrics:
+    """Timings and counters of Slack notifications of one publish session.
+
+    Timings are collected per stage name ('upload', 'api.chat.postMessage')
+    as number of calls, total and maximum duration. Counters hold sizes
+    and numbers of events ('upload.bytes', 'cache.directory.hits').
+
+    Object is thread safe.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timings = {}
+        self._counters = {}
+
+    @contextlib.contextmanager
+    def measure(self, name):
+        """Measure duration of code block.
+
+        Args:
+            name (str): Stage name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_timing(name, time.perf_counter() - start)
+
+    def add_timing(self, name, seconds):
+        """Add duration of one call of stage.
+
+        Args:
+            name (str): Stage name.
+            seconds (float): Duration of the call.
+        """
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                self._timings[name] = [1, seconds, seconds]
+                return
+            timing[0] += 1
+            timing[1] += seconds
+            if seconds > timing[2]:
+                timing[2] = seconds
+
+    def increment(self, name, value=1):
+        """Increment counter.
+
+        Args:
+            name (str): Counter name.
+            value (Union[int, float]): Value added to the counter.
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def to_data(self):
+        """Collected metrics.
+
+        Returns:
+            dict[str, Any]: 'timings' with 'count', 'total', 'max' and 'avg'
+                of each stage, 'counters' and cache 'hit_ratios'.
+        """
+        with self._lock:
+            timings = {
+                name: {
+                    "count": count,
+                    "total": total,
+                    "max": maximum,
+                    "avg": total / count,
+                }
+                for name, (count, total, maximum) in self._timings.items()
+            }
+            counters = dict(self._counters)
+
+        hit_ratios = {}
+        for name, hits in counters.items():
+            if not name.endswith(_HITS_SUFFIX):
+                continue
+            prefix = name[:-len(_HITS_SUFFIX)]
+            total = hits + counters.get(prefix + _MISSES_SUFFIX, 0)
+            if total:
+                hit_ratios[prefix] = hits / total
+        return {
+            "timings": timings,
+            "counters": counters,
+            "hit_ratios": hit_ratios,
+        }
+
+    def format_summary(self):
+        """Human readable summary of metrics.
+
+        Returns:
+            str: Multiline summary.
+        """
+        data = self.to_data()
+        lines = []
+        for name, timing in sorted(data["timings"].items()):
+            lines.append(
+                "{}: {} calls, {:.3f}s total, {:.3f}s max".format(
+                    name, timing["count"], timing["total"], timing["max"]
+                )
+            )
+        for name, value in sorted(data["counters"].items()):
+            if isinstance(value, float):
+                value = "{:.3f}".format(value)
+            lines.append("{}: {}".format(name, value))
+        for name, ratio in sorted(data["hit_ratios"].items()):
+            lines.append("{} hit ratio: {:.0%}".format(name, ratio))
+        return "\n".join(lines)
+
+    def to_prometheus(self):
+        """Metrics in Prometheus text exposition format.
+
+        Returns:
+            str: Prometheus text.
+        """
+        data = self.to_data()
+        lines = []
+        for metric, label, values in (
+            ("ayon_slack_stage_calls_total", "stage", {
+                name: timing["count"]
+                for name, timing in data["timings"].items()
+            }),
+            ("ayon_slack_stage_seconds_total", "stage", {
+                name: timing["total"]
+                for name, timing in data["timings"].items()
+            }),
+            ("ayon_slack_stage_seconds_max", "stage", {
+                name: timing["max"]
+                for name, timing in data["timings"].items()
+            }),
+            ("ayon_slack_cache_hit_ratio", "cache", data["hit_ratios"]),
+        ):
+            if not values:
+                continue
+            lines.append("# TYPE {} gauge".format(metric))
+            for name, value in sorted(values.items()):
+                lines.append('{}{{{}="{}"}} {}'.format(
+                    metric, label, name, value
+                ))
+
+        for name, value in sorted(data["counters"].items()):
+            metric = "ayon_slack_{}".format(
+                _PROMETHEUS_NAME_REGEX.sub("_", name)
+            )
+            lines.append("# TYPE {} gauge".format(metric))
+            lines.append("{} {}".format(metric, value))
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        """Write metrics to file.
+
+        Args:
+            path (str): Output path, '.prom' extension writes Prometheus
+                text format, otherwise JSON is written.
+        """
+        if path.endswith(".prom"):
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.to_data(), indent=4)
+
+        dirpath = os.path.dirname(path)
+        if dirpath:
+            os.makedirs(dirpath, exist_ok=True)
+        with open(path, "w") as stream:
+            stream.write(content)
+
+
+def get_slack_metrics(context):
+    """Get metrics stored on publish context.
+
+    Metrics are created on first call.
+
+    Args:
+        context (pyblish.api.Context): Publish context.
+
+    Returns:
+        SlackMetrics: Metrics of the publish session.
+    """
+    metrics = context.data.get(METRICS_KEY)
+    if metrics is None:
+        metrics = SlackMetrics()
+        context.data[METRICS_KEY] = metrics
+    return metrics
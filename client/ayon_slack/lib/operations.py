@@ -0,0 +1,339 @@
+import os
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+
+from .directory import SlackDirectory
+from .directory_cache import get_token_hash
+from .metrics import SlackMetrics
+from .scheduler import SlackRequestScheduler
+from .uploads import (
+    SlackUploadCache,
+    SlackUploadError,
+    stream_file_to_url,
+)
+
+# Base URL of Slack Web API, used to run against local stand-in server
+#   e.g. 'http://localhost:8765/api/'
+SLACK_API_URL_ENV = "AYON_SLACK_API_URL"
+
+
+class SlackOperations:
+    """Wrapper around Slack 'WebClient' used by publish plugins.
+
+    Args:
+        token (str): Slack bot token.
+        log (logging.Logger): Logger used for warnings.
+        ssl_context (Optional[ssl.SSLContext]): SSL context shared between
+            clients so certificates are loaded only once per session.
+        scheduler (Optional[SlackRequestScheduler]): Scheduler pacing all
+            requests of the client. New one is created if not passed.
+        metrics (Optional[SlackMetrics]): Metrics where timings of uploads
+            and uploaded bytes are recorded.
+        ledger (Optional[SlackDeliveryLedger]): Ledger where permalinks
+            of uploaded files are stored.
+    """
+    # Number of users requested per page of 'users.list'
+    users_page_limit = 200
+    # Files larger than this (bytes) are streamed in chunks
+    streaming_upload_threshold = 16 * 1024 * 1024
+    upload_chunk_size = 4 * 1024 * 1024
+    # Number of attempts to send content of streamed file
+    upload_attempts = 3
+    # Maximum number of files of one message uploaded at once
+    upload_workers = 4
+
+    def __init__(
+        self,
+        token,
+        log,
+        ssl_context=None,
+        scheduler=None,
+        metrics=None,
+        ledger=None,
+    ):
+        from slack_sdk import WebClient
+
+        if metrics is None:
+            metrics = SlackMetrics()
+        if scheduler is None:
+            scheduler = SlackRequestScheduler(log, metrics=metrics)
+        client_kwargs = {}
+        base_url = os.environ.get(SLACK_API_URL_ENV)
+        if base_url:
+            client_kwargs["base_url"] = base_url.rstrip("/") + "/"
+        self.client = WebClient(token=token, ssl=ssl_context, **client_kwargs)
+        self.scheduler = scheduler
+        self.metrics = metrics
+        self.upload_cache = SlackUploadCache(
+            metrics, ledger, get_token_hash(token)
+        )
+        self.log = log
+
+    def close(self):
+        """Release the underlying client.
+
+        Object must not be used after this call.
+        """
+        self.client = None
+
+    def _get_users_list(self, cursor=None):
+        kwargs = {"limit": self.users_page_limit}
+        if cursor:
+            kwargs["cursor"] = cursor
+        return self.scheduler.call(
+            "users.list", self.client.users_list, **kwargs
+        )
+
+    def _get_usergroups_list(self, cursor=None):
+        kwargs = {}
+        if cursor:
+            kwargs["cursor"] = cursor
+        return self.scheduler.call(
+            "usergroups.list", self.client.usergroups_list, **kwargs
+        )
+
+    def get_directory(self):
+        """Download users and usergroups of workspace.
+
+        Pages of users are added to directory index as they arrive, raw
+        Slack payload is not kept in memory.
+
+        Returns:
+            SlackDirectory: Directory of users and usergroups. Empty if
+                download failed.
+        """
+        directory = SlackDirectory()
+        try:
+            with self.metrics.measure("directory.download"):
+                for users in self._iter_users():
+                    directory.add_users(users)
+                for groups in self._iter_groups():
+                    directory.add_groups(groups)
+
+        except Exception:
+            self.log.warning("Cannot pull user info, "
+                             "mentions won't work", exc_info=True)
+            return SlackDirectory()
+
+        return directory
+
+    def lookup_user_id_by_email(self, email):
+        """Find Slack user by email.
+
+        Args:
+            email (str): Email address.
+
+        Returns:
+            Union[str, None]: Slack user ID or None if there is no user
+                with the email.
+        """
+        from slack_sdk.errors import SlackApiError
+        try:
+            response = self.scheduler.call(
+                "users.lookupByEmail",
+                self.client.users_lookupByEmail,
+                email=email,
+            )
+        except SlackApiError as e:
+            if e.response.get("error") == "users_not_found":
+                return None
+            raise
+        user = response.get("user") or {}
+        if user.get("deleted"):
+            return None
+        return user.get("id")
+
+    def send_message(self, channel, message, publish_files):
+        """Upload files and post message with their links to channel.
+
+        Errors are logged, not raised.
+
+        Returns:
+            bool: Message was sent.
+        """
+        from slack_sdk.errors import SlackApiError
+        try:
+            message = self.prepare_message(message, publish_files)
+
+            self.scheduler.call(
+                "chat.postMessage",
+                self.client.chat_postMessage,
+                bucket_key=channel,
+                channel=channel,
+                text=message
+            )
+            return True
+
+        except SlackApiError as e:
+            # # You will get a SlackApiError if "ok" is False
+            if e.response.get("error"):
+                error_str = self._enrich_error(
+                    str(e.response["error"]), channel
+                )
+            else:
+                error_str = self._enrich_error(str(e), channel)
+            self.log.warning("Error happened: {}".format(error_str),
+                             exc_info=True)
+        except Exception as e:
+            error_str = self._enrich_error(str(e), channel)
+            self.log.warning("Not SlackAPI error", exc_info=True)
+        return False
+
+    def prepare_message(self, message, publish_files):
+        """Upload files and add their links to message.
+
+        Args:
+            message (str): Message text.
+            publish_files (Iterable[str]): Paths to files to upload.
+
+        Returns:
+            str: Message with links to uploaded files.
+        """
+        with self.metrics.measure("upload.message"):
+            attachments = self._upload_attachments(publish_files)
+        return self._add_attachments(attachments, message)
+
+    def _upload_attachments(self, publish_files):
+        """Returns list of permalinks to uploaded files
+
+        Each file is uploaded only once per client, permalink of previous
+        upload is reused. Files are uploaded in parallel, permalinks are
+        returned in order of passed files.
+        """
+        publish_files = list(publish_files)
+        workers = min(self.upload_workers, len(publish_files))
+        if workers < 2:
+            return [
+                self._get_permalink(published_file)
+                for published_file in publish_files
+            ]
+
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="SlackUpload"
+        ) as executor:
+            return list(executor.map(self._get_permalink, publish_files))
+
+    def _get_permalink(self, published_file):
+        return self.upload_cache.get_permalink(published_file, self._upload)
+
+    def _upload(self, published_file):
+        """Upload file and return its permalink."""
+        size = os.path.getsize(published_file)
+        self.metrics.increment("upload.files")
+        self.metrics.increment("upload.bytes", size)
+        with self.metrics.measure("upload.file"):
+            if size > self.streaming_upload_threshold:
+                return self._upload_streaming(published_file)
+            return self._upload_small(published_file)
+
+    def _upload_small(self, published_file):
+        with open(published_file, "rb") as f:
+            uploaded_file = self.scheduler.call(
+                "files.upload",
+                self._upload_file,
+                f,
+                os.path.basename(published_file),
+            )
+        return uploaded_file.get("file").get("permalink")
+
+    def _upload_file(self, stream, filename):
+        # Rewind in case of retry after rate limit
+        stream.seek(0)
+        return self.client.files_upload_v2(filename=filename, file=stream)
+
+    def _upload_streaming(self, published_file):
+        """Upload large file using external upload flow.
+
+        File content is sent in chunks with bounded memory. Slack upload URL
+        does not support resuming, so failed transfer is started again with
+        new upload URL, up to 'upload_attempts' times.
+
+        Returns:
+            str: Permalink of uploaded file.
+        """
+        filename = os.path.basename(published_file)
+        size = os.path.getsize(published_file)
+        attempt = 0
+        while True:
+            attempt += 1
+            response = self.scheduler.call(
+                "files.getUploadURLExternal",
+                self.client.files_getUploadURLExternal,
+                filename=filename,
+                length=size,
+            )
+            try:
+                stream_file_to_url(
+                    response["upload_url"],
+                    published_file,
+                    self.upload_chunk_size,
+                    self.log,
+                    ssl_context=self.client.ssl,
+                    proxy=self.client.proxy,
+                    timeout=self.client.timeout,
+                )
+                break
+
+            except (OSError, http.client.HTTPException, SlackUploadError):
+                if attempt >= self.upload_attempts:
+                    raise
+                self.log.warning(
+                    "Upload of '{}' failed, retrying ({}/{})".format(
+                        filename, attempt, self.upload_attempts
+                    ),
+                    exc_info=True
+                )
+
+        completion = self.scheduler.call(
+            "files.completeUploadExternal",
+            self.client.files_completeUploadExternal,
+            files=[{"id": response["file_id"], "title": filename}],
+        )
+        return completion["files"][0]["permalink"]
+
+    def _add_attachments(self, attachments, message):
+        """Add permalink urls to message without displaying url."""
+        for permalink_url in attachments:
+            # format extremely important!
+            message += f"<{permalink_url}| >"
+        return message
+
+    def _iter_users(self):
+        """Yield pages of users (dicts) from users.list"""
+        yield from self._iter_pages(self._get_users_list, "members")
+
+    def _iter_groups(self):
+        """Yield pages of groups (dicts) from usergroups.list"""
+        yield from self._iter_pages(self._get_usergroups_list, "usergroups")
+
+    def _iter_pages(self, list_method, items_key):
+        """Yield items of paginated Slack list method page by page.
+
+        Args:
+            list_method (Callable[[Optional[str]], SlackResponse]): Method
+                requesting one page for passed cursor.
+            items_key (str): Key of items in response.
+
+        Yields:
+            list[dict]: Items of one page.
+        """
+        cursor = None
+        while True:
+            response = list_method(cursor)
+            yield response.get(items_key) or []
+
+            metadata = response.get("response_metadata") or {}
+            next_cursor = metadata.get("next_cursor")
+            if not next_cursor or next_cursor == cursor:
+                break
+            cursor = next_cursor
+
+    def _enrich_error(self, error_str, channel):
+        """Enhance known errors with more helpful notations."""
+        if "not_in_channel" in error_str:
+            # there is no file.write.public scope, app must be explicitly in
+            # the channel
+            error_str += (
+                " - application must added to channel '{}'. Ask Slack admin."
+            ).format(channel)
+        return error_str
@@ -0,0 +1,284 @@
+import os
+import json
+import time
+import uuid
+import logging
+
+from .directory_cache import get_slack_cache_dir
+from .clients import SlackClientRegistry
+
+OUTBOX_FORMAT_VERSION = 1
+PENDING_DIR = "pending"
+SENT_DIR = "sent"
+FAILED_DIR = "failed"
+# Extension of record which is being processed by a worker
+PROCESSING_EXT = ".processing"
+
+
+class SlackOutbox:
+    """Durable local spool of Slack notifications.
+
+    Publishing only writes rendered messages with paths to files to
+    upload into 'pending' directory and continues. Notifications are sent
+    later by 'drain' which is called by 'ayon addon slack drain-outbox'
+    command.
+
+    Each record is a json file with project name and list of deliveries
+    (channel, message and files). Deliveries which were sent are marked, so
+    retry of partially sent record does not post them again. Records are
+    moved to 'sent' or, after 'max_attempts', to 'failed' directory together
+    with the outcome.
+
+    Token is not stored in the spool, it is taken from project settings
+    when the record is sent.
+
+    Args:
+        root (Optional[str]): Spool directory. Defaults to outbox directory
+            in local AYON app data.
+        log (Optional[logging.Logger]): Logger.
+    """
+    max_attempts = 5
+    # Records in 'sent' and 'failed' are removed after this time (seconds)
+    keep_processed = 7 * 24 * 60 * 60
+    # Claimed records older than this are considered abandoned (seconds)
+    claim_timeout = 60 * 60
+
+    def __init__(self, root=None, log=None):
+        if root is None:
+            root = get_slack_cache_dir("outbox")
+        if log is None:
+            log = logging.getLogger(self.__class__.__name__)
+        self.root = root
+        self.log = log
+        for dirname in (PENDING_DIR, SENT_DIR, FAILED_DIR):
+            os.makedirs(os.path.join(root, dirname), exist_ok=True)
+
+    def enqueue(self, project_name, deliveries):
+        """Store notification to be sent later.
+
+        Args:
+            project_name (str): Project name used to get Slack settings.
+            deliveries (list[tuple[str, str, list[str]]]): Channel, rendered
+                message and paths to files to upload.
+
+        Returns:
+            str: Id of the record.
+        """
+        record_id = "{:.6f}_{}".format(time.time(), uuid.uuid4().hex[:8])
+        record = {
+            "version": OUTBOX_FORMAT_VERSION,
+            "id": record_id,
+            "created": time.time(),
+            "project_name": project_name,
+            "attempts": 0,
+            "next_attempt": 0,
+            "deliveries": [
+                {
+                    "channel": channel,
+                    "message": message,
+                    "files": list(publish_files),
+                    "sent": False,
+                }
+                for channel, message, publish_files in deliveries
+            ],
+        }
+        self._write(self._get_path(PENDING_DIR, record_id), record)
+        return record_id
+
+    def drain(self, token_getter=None):
+        """Send all pending notifications which are due.
+
+        Args:
+            token_getter (Optional[Callable[[str], str]]): Function returning
+                Slack token for project name. Project settings are used
+                by default.
+
+        Returns:
+            dict[str, int]: Number of 'sent', 'failed' and 'postponed'
+                records.
+        """
+        if token_getter is None:
+            token_getter = _get_project_token
+
+        self._recover_stale_claims()
+
+        result = {"sent": 0, "failed": 0, "postponed": 0}
+        registry = SlackClientRegistry(self.log)
+        tokens_by_project = {}
+        try:
+            for record_id in self._get_pending_ids():
+                path = self._claim(record_id)
+                if path is None:
+                    continue
+
+                record = self._read(path)
+                if record is None:
+                    os.replace(path, self._get_path(FAILED_DIR, record_id))
+                    result["failed"] += 1
+                    continue
+
+                if record["next_attempt"] > time.time():
+                    os.replace(path, self._get_path(PENDING_DIR, record_id))
+                    continue
+
+                project_name = record["project_name"]
+                if project_name not in tokens_by_project:
+                    try:
+                        tokens_by_project[project_name] = token_getter(
+                            project_name
+                        )
+                    except Exception as exc:
+                        self.log.warning(
+                            "Failed to get Slack token for project"
+                            " '{}'".format(project_name),
+                            exc_info=True
+                        )
+                        tokens_by_project[project_name] = exc
+                token = tokens_by_project[project_name]
+                try:
+                    outcome = self._send_record(registry, token, record)
+                except Exception as exc:
+                    self.log.warning(
+                        "Failed to send Slack notification '{}'".format(
+                            record_id
+                        ),
+                        exc_info=True
+                    )
+                    outcome = self._postpone(record, str(exc))
+                result[outcome] += 1
+        finally:
+            registry.close()
+
+        self._remove_old_processed()
+        return result
+
+    def _send_record(self, registry, token, record):
+        record["attempts"] += 1
+        record["last_attempt"] = time.time()
+        # Exception raised when token was requested
+        if isinstance(token, Exception):
+            error = "Failed to get Slack token for project '{}': {}".format(
+                record["project_name"], token
+            )
+        elif not token:
+            error = "Slack token is not set for project '{}'".format(
+                record["project_name"]
+            )
+        else:
+            client = registry.get_operations(token)
+            for delivery in record["deliveries"]:
+                if not delivery["sent"]:
+                    delivery["sent"] = client.send_message(
+                        delivery["channel"],
+                        delivery["message"],
+                        delivery["files"],
+                    )
+            unsent = [
+                delivery["channel"]
+                for delivery in record["deliveries"]
+                if not delivery["sent"]
+            ]
+            if not unsent:
+                self._finish(record, SENT_DIR)
+                return "sent"
+            error = "Failed to send message to channels: {}".format(
+                ", ".join(unsent)
+            )
+        return self._postpone(record, error)
+
+    def _postpone(self, record, error):
+        """Release failed record for next attempt or give it up."""
+        record["last_error"] = error
+        if record["attempts"] >= self.max_attempts:
+            self.log.warning(
+                "Giving up Slack notification '{}'. {}".format(
+                    record["id"], error
+                )
+            )
+            self._finish(record, FAILED_DIR)
+            return "failed"
+
+        # Exponential backoff between attempts
+        record["next_attempt"] = time.time() + 60 * 2 ** record["attempts"]
+        self._release(self._get_processing_path(record["id"]), record)
+        return "postponed"
+
+    def _get_path(self, dirname, record_id):
+        return os.path.join(self.root, dirname, record_id + ".json")
+
+    def _get_processing_path(self, record_id):
+        return self._get_path(PENDING_DIR, record_id) + PROCESSING_EXT
+
+    def _get_pending_ids(self):
+        return sorted(
+            filename[:-len(".json")]
+            for filename in os.listdir(os.path.join(self.root, PENDING_DIR))
+            if filename.endswith(".json")
+        )
+
+    def _claim(self, record_id):
+        """Mark record as processed so other workers skip it."""
+        path = self._get_processing_path(record_id)
+        try:
+            os.replace(self._get_path(PENDING_DIR, record_id), path)
+        except OSError:
+            return None
+        # Claim time is used to detect abandoned records
+        os.utime(path)
+        return path
+
+    def _recover_stale_claims(self):
+        """Return records claimed by crashed worker back to pending."""
+        limit = time.time() - self.claim_timeout
+        dirpath = os.path.join(self.root, PENDING_DIR)
+        for filename in os.listdir(dirpath):
+            if not filename.endswith(PROCESSING_EXT):
+                continue
+            path = os.path.join(dirpath, filename)
+            if os.path.getmtime(path) < limit:
+                os.replace(path, path[:-len(PROCESSING_EXT)])
+
+    def _release(self, path, record):
+        self._write(path, record)
+        os.replace(path, self._get_path(PENDING_DIR, record["id"]))
+
+    def _finish(self, record, dirname):
+        record["finished"] = time.time()
+        self._write(self._get_path(dirname, record["id"]), record)
+        os.remove(self._get_processing_path(record["id"]))
+
+    def _remove_old_processed(self):
+        limit = time.time() - self.keep_processed
+        for dirname in (SENT_DIR, FAILED_DIR):
+            dirpath = os.path.join(self.root, dirname)
+            for filename in os.listdir(dirpath):
+                path = os.path.join(dirpath, filename)
+                if os.path.getmtime(path) < limit:
+                    os.remove(path)
+
+    def _read(self, path):
+        try:
+            with open(path, "r") as stream:
+                record = json.load(stream)
+        except Exception:
+            self.log.warning(
+                "Invalid Slack outbox record '{}'".format(path),
+                exc_info=True
+            )
+            return None
+
+        if record.get("version") != OUTBOX_FORMAT_VERSION:
+            return None
+        return record
+
+    def _write(self, path, record):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as stream:
+            json.dump(record, stream)
+        os.replace(tmp_path, path)
+
+
+def _get_project_token(project_name):
+    from ayon_core.settings import get_project_settings
+
+    return get_project_settings(project_name)["slack"]["token"]
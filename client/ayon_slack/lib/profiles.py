@@ -0,0 +1,175 @@
+import re
+
+# Filter values matching this are compared as plain strings
+_LITERAL_REGEX = re.compile(r"^[A-Za-z0-9_\- ]+$")
+
+
+class _ProfileFilter:
+    """Compiled filter of one profile key."""
+    __slots__ = ("literals", "regexes")
+
+    def __init__(self, values):
+        self.literals = set()
+        self.regexes = []
+        for value in values:
+            if not value:
+                continue
+            if _LITERAL_REGEX.match(value):
+                self.literals.add(value)
+            else:
+                self.regexes.append(re.compile(value))
+
+    @property
+    def is_literal(self):
+        return not self.regexes
+
+    def match(self, value):
+        if value in self.literals:
+            return True
+        for regex in self.regexes:
+            if regex.fullmatch(value):
+                return True
+        return False
+
+
+class _CompiledProfile:
+    __slots__ = ("index", "profile", "filters")
+
+    def __init__(self, index, profile, filters):
+        self.index = index
+        self.profile = profile
+        self.filters = filters
+
+
+class SlackProfileMatcher:
+    """Precompiled profiles giving the same result as 'filter_profiles'.
+
+    Filter values of profiles are compiled once. Profiles are indexed by
+    exact values of keys in 'bucket_keys', so only profiles which can
+    match are evaluated. Results are memoized for each combination of
+    key values.
+
+    Same as 'filter_profiles' empty filter or filter with '*' matches any
+    value, profile with most matching filters wins and ties are resolved
+    by matching filters in order of keys.
+
+    Args:
+        profiles (list[dict[str, Any]]): Profiles from settings.
+        bucket_keys (Iterable[str]): Keys used for exact-match index.
+        cache_size (int): Maximum number of memoized results.
+    """
+    def __init__(
+        self,
+        profiles,
+        bucket_keys=("host_names", "product_base_types"),
+        cache_size=4096,
+    ):
+        self.profiles = profiles
+        self._cache_size = cache_size
+        self._cache = {}
+        self._compiled = []
+        # {key: {value: [CompiledProfile]}}
+        self._buckets = {key: {} for key in bucket_keys}
+        # {key: [CompiledProfile]} profiles which must be checked always
+        self._unindexed = {key: [] for key in bucket_keys}
+
+        for index, profile in enumerate(profiles or []):
+            filters = {}
+            for key, values in profile.items():
+                if not isinstance(values, (list, tuple, set)):
+                    values = [values]
+                if not values or "*" in values:
+                    continue
+                if not all(isinstance(value, str) for value in values):
+                    continue
+                filters[key] = _ProfileFilter(values)
+
+            compiled = _CompiledProfile(index, profile, filters)
+            self._compiled.append(compiled)
+            for key, buckets in self._buckets.items():
+                profile_filter = filters.get(key)
+                if profile_filter is None or not profile_filter.is_literal:
+                    self._unindexed[key].append(compiled)
+                    continue
+                for value in profile_filter.literals:
+                    buckets.setdefault(value, []).append(compiled)
+
+    def match(self, key_values):
+        """Find best matching profile.
+
+        Args:
+            key_values (dict[str, Any]): Values of profile keys, order of
+                keys defines priority when more profiles match.
+
+        Returns:
+            Union[dict[str, Any], None]: Matching profile or None.
+        """
+        cache_key = tuple(key_values.items())
+        try:
+            return self._cache[cache_key]
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable values
+            return self._match(key_values)
+
+        profile = self._match(key_values)
+        if len(self._cache) >= self._cache_size:
+            self._cache.clear()
+        self._cache[cache_key] = profile
+        return profile
+
+    def _get_candidates(self, key_values):
+        candidates = None
+        for key, buckets in self._buckets.items():
+            if key not in key_values:
+                continue
+            key_candidates = set(self._unindexed[key])
+            key_candidates.update(buckets.get(key_values[key], []))
+            if candidates is None:
+                candidates = key_candidates
+            else:
+                candidates &= key_candidates
+
+        if candidates is None:
+            return self._compiled
+        return sorted(candidates, key=lambda item: item.index)
+
+    def _match(self, key_values):
+        keys_order = tuple(key_values.keys())
+        highest_points = -1
+        matching = []
+        for compiled in self._get_candidates(key_values):
+            points = 0
+            scores = []
+            for key in keys_order:
+                profile_filter = compiled.filters.get(key)
+                if profile_filter is None:
+                    scores.append(False)
+                    continue
+                value = key_values[key]
+                if not value or not profile_filter.match(value):
+                    break
+                points += 1
+                scores.append(True)
+            else:
+                if points > highest_points:
+                    highest_points = points
+                    matching = []
+                if points == highest_points:
+                    matching.append((compiled.profile, scores))
+
+        if not matching:
+            return None
+        return _profile_exclusion(matching, len(keys_order))
+
+
+def _profile_exclusion(matching, scores_len):
+    """Select profile with matching filters of keys with higher priority."""
+    for idx in range(scores_len):
+        if len(matching) == 1:
+            break
+        profiles_true = [item for item in matching if item[1][idx]]
+        if profiles_true:
+            matching = profiles_true
+    return matching[0][0]
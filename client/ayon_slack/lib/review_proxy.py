@@ -0,0 +1,158 @@
+import os
+
+# Suffix of proxy file created next to the published review
+PROXY_SUFFIX = "_slackProxy"
+PROXY_EXTENSIONS = {
+    "h264": ".mp4",
+    "gif": ".gif",
+    "webp": ".webp",
+}
+# Bitrate reserved for audio stream of H.264 proxy (kbit/s)
+AUDIO_BITRATE = 96
+# Lowest video bitrate of H.264 proxy (kbit/s)
+MIN_VIDEO_BITRATE = 150
+
+
+def get_proxy_path(review_path, proxy_format):
+    """Path of proxy file created for review.
+
+    Args:
+        review_path (str): Path to published review.
+        proxy_format (str): 'h264', 'gif' or 'webp'.
+
+    Returns:
+        str: Path to proxy file next to the review.
+    """
+    basename = os.path.splitext(review_path)[0]
+    return basename + PROXY_SUFFIX + PROXY_EXTENSIONS[proxy_format]
+
+
+def get_review_proxy(review_path, proxy_settings, size_limit, log):
+    """Get small preview of review which can be uploaded to Slack.
+
+    Proxy is created with ffmpeg next to the published review and reused
+    when it is newer than the review.
+
+    Args:
+        review_path (str): Path to published review.
+        proxy_settings (dict[str, Any]): 'format', 'max_width',
+            'target_size' (MB) and 'fps' (only for animated images).
+        size_limit (float): Upload limit in MB, used when target size
+            is not set.
+        log (logging.Logger): Logger.
+
+    Returns:
+        Union[str, None]: Path to proxy or None if proxy could not be
+            created within the limit.
+    """
+    proxy_format = proxy_settings.get("format") or "h264"
+    proxy_path = get_proxy_path(review_path, proxy_format)
+    target_size = proxy_settings.get("target_size") or size_limit
+    target_size = min(target_size, size_limit)
+
+    if (
+        os.path.exists(proxy_path)
+        and os.path.getmtime(proxy_path) >= os.path.getmtime(review_path)
+    ):
+        log.debug("Using existing review proxy '{}'".format(proxy_path))
+    else:
+        try:
+            _create_proxy(
+                review_path, proxy_path, proxy_format, proxy_settings,
+                target_size, log
+            )
+        except Exception:
+            log.warning(
+                "Failed to create review proxy for '{}'".format(review_path),
+                exc_info=True
+            )
+            _remove_file(proxy_path)
+            return None
+
+    proxy_size = os.path.getsize(proxy_path) / 1024 / 1024
+    if proxy_size > size_limit:
+        log.info(
+            "Review proxy '{}' is too large ({:.1f} MB)".format(
+                proxy_path, proxy_size
+            )
+        )
+        return None
+    return proxy_path
+
+
+def _create_proxy(
+    review_path, proxy_path, proxy_format, proxy_settings, target_size, log
+):
+    from ayon_core.lib import get_ffmpeg_tool_args, run_subprocess
+
+    max_width = proxy_settings.get("max_width") or 1280
+    # Keep even dimensions required by H.264
+    scale_filter = (
+        "scale='min({},iw)':-2:flags=lanczos".format(max_width)
+    )
+
+    # Write to temporary file so interrupted transcode is not reused
+    tmp_path = "{}.tmp{}".format(*os.path.splitext(proxy_path))
+    args = get_ffmpeg_tool_args("ffmpeg", "-y", "-i", review_path)
+    if proxy_format == "h264":
+        video_bitrate = _get_video_bitrate(review_path, target_size, log)
+        args.extend([
+            "-vf", scale_filter,
+            "-c:v", "libx264",
+            "-preset", "veryfast",
+            "-pix_fmt", "yuv420p",
+            "-b:v", "{}k".format(video_bitrate),
+            "-maxrate", "{}k".format(video_bitrate),
+            "-bufsize", "{}k".format(video_bitrate * 2),
+            "-c:a", "aac",
+            "-b:a", "{}k".format(AUDIO_BITRATE),
+            "-movflags", "+faststart",
+            "-f", "mp4",
+        ])
+    else:
+        fps = proxy_settings.get("fps") or 12
+        args.extend([
+            "-vf", "fps={},{}".format(fps, scale_filter),
+            "-loop", "0",
+            "-an",
+        ])
+        if proxy_format == "webp":
+            args.extend(["-c:v", "libwebp", "-quality", "70", "-f", "webp"])
+        else:
+            args.extend(["-f", "gif"])
+    args.append(tmp_path)
+
+    log.info("Creating review proxy '{}'".format(proxy_path))
+    run_subprocess(args, logger=log)
+    os.replace(tmp_path, proxy_path)
+
+
+def _get_video_bitrate(review_path, target_size, log):
+    """Video bitrate in kbit/s fitting review duration to target size."""
+    from ayon_core.lib.transcoding import get_ffprobe_data
+
+    duration = None
+    try:
+        ffprobe_data = get_ffprobe_data(review_path, log)
+        duration = float(ffprobe_data["format"]["duration"])
+    except Exception:
+        log.debug(
+            "Failed to get duration of '{}'".format(review_path),
+            exc_info=True
+        )
+
+    if not duration:
+        return MIN_VIDEO_BITRATE
+
+    # Keep 10% reserve for container overhead
+    total_bitrate = target_size * 8 * 1024 * 0.9 / duration
+    return max(MIN_VIDEO_BITRATE, int(total_bitrate - AUDIO_BITRATE))
+
+
+def _remove_file(path):
+    for filepath in (path, "{}.tmp{}".format(*os.path.splitext(path))):
+        if os.path.exists(filepath):
+            try:
+                os.remove(filepath)
+            except OSError:
+                pass
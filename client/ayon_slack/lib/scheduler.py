@@ -0,0 +1,231 @@
+import time
+import random
+import threading
+import collections
+
+from .metrics import SlackMetrics
+
+# Requests per minute allowed by Slack for each rate limit tier
+#   https://api.slack.com/apis/rate-limits
+TIER_REQUESTS_PER_MINUTE = {
+    1: 1,
+    2: 20,
+    3: 50,
+    4: 100,
+    # 'chat.postMessage' allows about 1 message per second per channel
+    "post": 60,
+}
+
+SLACK_METHOD_TIERS = {
+    "auth.test": 4,
+    "users.list": 2,
+    "usergroups.list": 2,
+    "users.lookupByEmail": 3,
+    "files.upload": 4,
+    "files.getUploadURLExternal": 4,
+    "files.completeUploadExternal": 4,
+    "chat.postMessage": "post",
+}
+DEFAULT_TIER = 3
+# Burst size of tiers used by paginated reads, directory of 10k members
+#   (50 pages of 'users.list') is downloaded without pacing, longer
+#   downloads rely on 'Retry-After' of Slack
+TIER_BURST_SIZE = {
+    2: 60,
+}
+
+
+class TokenBucket:
+    """Thread safe token bucket pacing requests of one rate limit tier.
+
+    Args:
+        requests_per_minute (float): Sustained rate of requests.
+        capacity (Optional[float]): Maximum burst size. Defaults to
+            half a minute worth of requests, at least 1.
+    """
+    def __init__(self, requests_per_minute, capacity=None):
+        if capacity is None:
+            capacity = max(1.0, requests_per_minute / 2.0)
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds):
+        """Do not release any token for next 'seconds'."""
+        with self._lock:
+            self._paused_until = max(
+                self._paused_until, time.monotonic() + seconds
+            )
+            self._tokens = 0.0
+
+    def acquire(self, deadline=None):
+        """Block until token is available.
+
+        Args:
+            deadline (Optional[float]): 'time.monotonic' value after which
+                waiting for token is not allowed.
+
+        Returns:
+            float: Time in seconds spent waiting.
+
+        Raises:
+            TimeoutError: Token would not be available before deadline.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                else:
+                    start = max(self._updated, self._paused_until)
+                    self._tokens = min(
+                        self.capacity,
+                        self._tokens + (now - start) * self.rate
+                    )
+                    self._updated = now
+                    if self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        return waited
+                    delay = (1.0 - self._tokens) / self.rate
+            if deadline is not None and now + delay > deadline:
+                raise TimeoutError(
+                    "Rate limit would delay request by {:.1f}s".format(delay)
+                )
+            time.sleep(delay)
+            waited += delay
+
+
+class SlackRequestScheduler:
+    """Paces and retries Slack API calls to respect Slack rate limits.
+
+    Each Slack method belongs to a rate limit tier which has its own token
+    bucket, so requests are delayed before Slack starts to reject them.
+    When Slack responds with HTTP 429 the call is retried after
+    'Retry-After' seconds (with a random jitter) and the whole tier is
+    paused for that time. Retries stop after 'max_retries' or when waiting
+    would exceed 'max_wait' seconds, then the original error is raised.
+    Pacing counts to 'max_wait' too, 'TimeoutError' is raised when pacing
+    would exceed it.
+
+    Args:
+        log (logging.Logger): Logger.
+        max_retries (int): Maximum number of retries of one call.
+        max_wait (float): Maximum time in seconds one call may spend
+            waiting for pacing and retries.
+        metrics (Optional[SlackMetrics]): Metrics where latency of each
+            request is recorded.
+    """
+    def __init__(self, log, max_retries=5, max_wait=120.0, metrics=None):
+        if metrics is None:
+            metrics = SlackMetrics()
+        self.log = log
+        self.metrics = metrics
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._counters = collections.Counter()
+
+    def get_counters(self):
+        """Statistics of scheduled calls.
+
+        Returns:
+            dict[str, Union[int, float]]: Number of 'calls', 'throttled'
+                responses, 'retried' and 'failed' calls and 'wait_time'
+                spent in pacing and backoff.
+        """
+        with self._lock:
+            counters = {
+                "calls": 0,
+                "throttled": 0,
+                "retried": 0,
+                "failed": 0,
+                "wait_time": 0.0,
+            }
+            counters.update(self._counters)
+            return counters
+
+    def call(self, method_name, func, *args, bucket_key=None, **kwargs):
+        """Call Slack API function paced by its rate limit tier.
+
+        Args:
+            method_name (str): Slack API method name, e.g. 'users.list'.
+            func (Callable): Function doing the request.
+            *args (Any): Positional arguments for 'func'.
+            bucket_key (Optional[str]): Additional key of rate limit, e.g.
+                channel for 'chat.postMessage'.
+            **kwargs (Any): Keyword arguments for 'func'.
+
+        Returns:
+            Any: Result of 'func'.
+        """
+        from slack_sdk.errors import SlackApiError
+
+        bucket = self._get_bucket(method_name, bucket_key)
+        deadline = time.monotonic() + self.max_wait
+        attempt = 0
+        while True:
+            try:
+                self._add("wait_time", bucket.acquire(deadline))
+            except TimeoutError:
+                self._add("failed")
+                raise
+            self._add("calls")
+            try:
+                with self.metrics.measure("api." + method_name):
+                    return func(*args, **kwargs)
+
+            except SlackApiError as exc:
+                if exc.response.status_code != 429:
+                    raise
+
+                self._add("throttled")
+                delay = self._get_retry_delay(exc.response, attempt)
+                bucket.pause(delay)
+                if (
+                    attempt >= self.max_retries
+                    or time.monotonic() + delay > deadline
+                ):
+                    self._add("failed")
+                    raise
+
+            attempt += 1
+            self._add("retried")
+            self._add("wait_time", delay)
+            self.log.debug(
+                "Slack rate limit hit on '{}', retrying in {:.1f}s".format(
+                    method_name, delay
+                )
+            )
+            time.sleep(delay)
+
+    def _get_retry_delay(self, response, attempt):
+        headers = response.headers or {}
+        retry_after = headers.get("Retry-After", headers.get("retry-after"))
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            # Exponential backoff if Slack did not tell how long to wait
+            delay = float(2 ** attempt)
+        return delay + random.uniform(0.0, 0.25 * delay + 0.5)
+
+    def _get_bucket(self, method_name, bucket_key):
+        tier = SLACK_METHOD_TIERS.get(method_name, DEFAULT_TIER)
+        key = (tier, bucket_key)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(
+                    TIER_REQUESTS_PER_MINUTE[tier],
+                    TIER_BURST_SIZE.get(tier),
+                )
+                self._buckets[key] = bucket
+            return bucket
+
+    def _add(self, key, value=1):
+        with self._lock:
+            self._counters[key] += value
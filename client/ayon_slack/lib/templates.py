@@ -0,0 +1,167 @@
+import re
+import functools
+
+# Keys used in older settings mapped to current anatomy keys
+LEGACY_TEMPLATE_KEYS = {
+    "{task}": "{task[name]}",
+    "{Task}": "{Task[name]}",
+    "{TASK}": "{TASK[NAME]}",
+    "{asset}": "{folder[name]}",
+    "{Asset}": "{Folder[name]}",
+    "{ASSET}": "{FOLDER[NAME]}",
+    "{subset}": "{product[name]}",
+    "{Subset}": "{Product[name]}",
+    "{SUBSET}": "{PRODUCT[NAME]}",
+    "{family}": "{product[type]}",
+    "{Family}": "{Product[type]}",
+    "{FAMILY}": "{PRODUCT[TYPE]}",
+}
+_LEGACY_KEYS_REGEX = re.compile(
+    "|".join(re.escape(key) for key in LEGACY_TEMPLATE_KEYS)
+)
+# First key of each template placeholder, e.g. 'Task' for '{Task[name]}'
+_ROOT_KEY_REGEX = re.compile(r"\{([^{}\[\]:!<>]+)")
+
+
+def normalize_legacy_keys(template):
+    """Replace legacy keys in template with current anatomy keys.
+
+    Args:
+        template (str): Message template.
+
+    Returns:
+        str: Template with replaced keys.
+    """
+    return _LEGACY_KEYS_REGEX.sub(
+        lambda match: LEGACY_TEMPLATE_KEYS[match.group(0)], template
+    )
+
+
+class CompiledTemplate:
+    """Parsed message template.
+
+    Args:
+        template (str): Message template with normalized keys.
+    """
+    __slots__ = ("template", "root_keys")
+
+    def __init__(self, template):
+        from ayon_core.lib import StringTemplate
+
+        self.template = StringTemplate(template)
+        self.root_keys = frozenset(_ROOT_KEY_REGEX.findall(template))
+
+    def format(self, fill_data):
+        """Fill template.
+
+        Args:
+            fill_data (dict[str, Any]): Fill data.
+
+        Returns:
+            TemplateResult: Filled template.
+        """
+        if isinstance(fill_data, CaseVariantsData):
+            fill_data.resolve_keys(self.root_keys)
+        return self.template.format(fill_data)
+
+
+@functools.lru_cache(maxsize=256)
+def compile_template(template):
+    """Parse message template, result is cached for each template string.
+
+    Args:
+        template (str): Message template.
+
+    Returns:
+        CompiledTemplate: Parsed template with normalized legacy keys.
+    """
+    return CompiledTemplate(normalize_legacy_keys(template))
+
+
+def _capitalize_value(value):
+    if not value:
+        return value
+    return value[0].upper() + value[1:]
+
+
+def _upper_variant(value):
+    if isinstance(value, str):
+        return value.upper()
+    if isinstance(value, dict):
+        return {
+            key.upper() if isinstance(key, str) else key: _upper_variant(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [_upper_variant(item) for item in value]
+    return value
+
+
+def _capitalized_variant(value):
+    if isinstance(value, str):
+        return _capitalize_value(value)
+    if isinstance(value, dict):
+        return {
+            key: _capitalized_variant(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [_capitalized_variant(item) for item in value]
+    return value
+
+
+class CaseVariantsData(dict):
+    """Template fill data creating case variants of keys on demand.
+
+    Contains passed data as they are. Upper case ('TASK') and capitalized
+    ('Task') variants of keys with values converted to the same case are
+    created only when template asks for them, then they are stored.
+    Upper case variant converts also keys of nested dictionaries
+    ('{TASK[NAME]}'), capitalized variant converts only values
+    ('{Task[name]}').
+
+    Args:
+        data (dict[str, Any]): Source fill data.
+    """
+    def __init__(self, data):
+        super().__init__(data)
+        self._variants = {}
+        for key in data:
+            if not isinstance(key, str):
+                continue
+            for variant_key, convert in (
+                (key.upper(), _upper_variant),
+                (key.capitalize(), _capitalized_variant),
+            ):
+                if variant_key not in data:
+                    self._variants.setdefault(variant_key, (key, convert))
+
+    def __missing__(self, key):
+        variant = self._variants.get(key)
+        if variant is None:
+            raise KeyError(key)
+        src_key, convert = variant
+        value = convert(dict.__getitem__(self, src_key))
+        self[key] = value
+        return value
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or key in self._variants
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def resolve_keys(self, keys):
+        """Create variants of passed keys if they are not created yet.
+
+        Args:
+            keys (Iterable[str]): Top level keys.
+        """
+        for key in keys:
+            if (
+                not dict.__contains__(self, key)
+                and key in self._variants
+            ):
+                self.__missing__(key)
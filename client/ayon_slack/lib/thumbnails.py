@@ -0,0 +1,157 @@
+import os
+import time
+import hashlib
+import threading
+
+from .directory_cache import get_slack_cache_dir
+
+# Quality values of ffmpeg mjpeg encoder tried in order, lower is better
+JPEG_QUALITIES = (3, 5, 8, 12, 18, 25)
+# Maximum dimension is reduced by this factor when no quality fits budget
+DOWNSCALE_FACTOR = 0.75
+MIN_DIMENSION = 64
+# Processed thumbnails not used for this time are removed (seconds)
+THUMBNAIL_RETENTION = 30 * 24 * 60 * 60
+
+# Cache directories already pruned by this process
+_PRUNED_DIRS = set()
+_PRUNE_LOCK = threading.Lock()
+
+
+def get_file_hash(path):
+    """Hash of file content.
+
+    Args:
+        path (str): Path to file.
+
+    Returns:
+        str: Hex digest of the content.
+    """
+    file_hash = hashlib.sha1()
+    with open(path, "rb") as stream:
+        for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def prepare_thumbnail(path, max_dimension, max_size, log, cache_dir=None):
+    """Get thumbnail fitting into pixel and byte budget.
+
+    Thumbnail which already fits is returned as is. Otherwise it is
+    downscaled and recompressed to JPEG with ffmpeg. Result is cached
+    by hash of source content and budget, so the same thumbnail is
+    processed only once. Cached thumbnails not used for
+    'THUMBNAIL_RETENTION' are removed.
+
+    Args:
+        path (str): Path to thumbnail.
+        max_dimension (int): Maximum width and height in pixels.
+        max_size (int): Maximum file size in bytes.
+        log (logging.Logger): Logger.
+        cache_dir (Optional[str]): Directory of processed thumbnails.
+
+    Returns:
+        str: Path to thumbnail which should be uploaded.
+    """
+    if os.path.getsize(path) <= max_size:
+        dimensions = _get_dimensions(path, log)
+        if dimensions and max(dimensions) <= max_dimension:
+            return path
+
+    if cache_dir is None:
+        cache_dir = get_slack_cache_dir("thumbnails")
+    _prune_cache_dir(cache_dir, log)
+    output_path = os.path.join(
+        cache_dir,
+        "{}_{}_{}.jpg".format(get_file_hash(path), max_dimension, max_size)
+    )
+    if os.path.exists(output_path):
+        log.debug("Using cached thumbnail '{}'".format(output_path))
+        # Modification time marks last use for pruning
+        os.utime(output_path)
+        return output_path
+
+    try:
+        _create_thumbnail(path, output_path, max_dimension, max_size, log)
+    except Exception:
+        log.warning(
+            "Failed to prepare thumbnail '{}'".format(path), exc_info=True
+        )
+        return path
+    return output_path
+
+
+def _prune_cache_dir(cache_dir, log):
+    """Remove old processed thumbnails, once per process."""
+    with _PRUNE_LOCK:
+        if cache_dir in _PRUNED_DIRS:
+            return
+        _PRUNED_DIRS.add(cache_dir)
+
+    limit = time.time() - THUMBNAIL_RETENTION
+    for filename in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, filename)
+        try:
+            if os.path.getmtime(path) < limit:
+                os.remove(path)
+        except OSError:
+            log.debug(
+                "Failed to remove cached thumbnail '{}'".format(path),
+                exc_info=True
+            )
+
+
+def _create_thumbnail(path, output_path, max_dimension, max_size, log):
+    from ayon_core.lib import get_ffmpeg_tool_args, run_subprocess
+
+    tmp_path = "{}.tmp.jpg".format(os.path.splitext(output_path)[0])
+    dimension = max_dimension
+    try:
+        while True:
+            for quality in JPEG_QUALITIES:
+                args = get_ffmpeg_tool_args(
+                    "ffmpeg",
+                    "-y",
+                    "-i", path,
+                    "-vf", (
+                        "scale='min({0},iw)':'min({0},ih)'"
+                        ":force_original_aspect_ratio=decrease"
+                    ).format(dimension),
+                    "-frames:v", "1",
+                    "-q:v", str(quality),
+                    "-f", "image2",
+                    "-c:v", "mjpeg",
+                    tmp_path,
+                )
+                run_subprocess(args, logger=log)
+                if os.path.getsize(tmp_path) <= max_size:
+                    os.replace(tmp_path, output_path)
+                    return
+
+            if dimension <= MIN_DIMENSION:
+                break
+            dimension = max(MIN_DIMENSION, int(dimension * DOWNSCALE_FACTOR))
+
+        # Use smallest result even if it does not fit the budget
+        log.debug("Thumbnail '{}' does not fit {} bytes".format(
+            path, max_size
+        ))
+        os.replace(tmp_path, output_path)
+
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _get_dimensions(path, log):
+    from ayon_core.lib.transcoding import get_ffprobe_data
+
+    try:
+        ffprobe_data = get_ffprobe_data(path, log)
+    except Exception:
+        return None
+
+    for stream in ffprobe_data.get("streams", []):
+        if stream.get("codec_type") == "video":
+            return stream.get("width", 0), stream.get("height", 0)
+    return None
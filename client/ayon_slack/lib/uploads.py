@@ -0,0 +1,203 @@
+import os
+import threading
+import http.client
+import urllib.parse
+
+from .metrics import SlackMetrics
+
+
+class SlackUploadError(Exception):
+    """Upload of file content to Slack upload URL failed."""
+
+
+def get_file_key(path):
+    """Key identifying content of file on disk.
+
+    Args:
+        path (str): Path to file.
+
+    Returns:
+        tuple[str, int, int]: Normalized path, size and modification time.
+    """
+    stat = os.stat(path)
+    return (
+        os.path.normcase(os.path.abspath(path)),
+        stat.st_size,
+        stat.st_mtime_ns,
+    )
+
+
+class SlackUploadCache:
+    """Permalinks of files already uploaded to Slack.
+
+    File is uploaded only once, following requests for the same file return
+    permalink of the first upload. File is identified by path, size and
+    modification time so changed file is uploaded again.
+
+    Concurrent requests for the same file wait for the first upload instead
+    of uploading it in parallel.
+
+    If ledger is passed, permalinks are also stored in it and reused
+    by following publishes.
+
+    Args:
+        metrics (Optional[SlackMetrics]): Metrics where cache hits
+            are counted.
+        ledger (Optional[SlackDeliveryLedger]): Persistent store
+            of permalinks.
+        workspace_key (Optional[str]): Key of workspace in ledger.
+    """
+    def __init__(self, metrics=None, ledger=None, workspace_key=None):
+        if metrics is None:
+            metrics = SlackMetrics()
+        self.metrics = metrics
+        self.ledger = ledger
+        self.workspace_key = workspace_key
+        self._lock = threading.Lock()
+        self._permalinks = {}
+        self._pending = {}
+
+    def get_permalink(self, path, upload_func):
+        """Get permalink of file, upload it if was not uploaded yet.
+
+        Args:
+            path (str): Path to file.
+            upload_func (Callable[[str], str]): Function uploading file
+                and returning its permalink.
+
+        Returns:
+            str: Permalink of uploaded file.
+        """
+        key = get_file_key(path)
+        while True:
+            with self._lock:
+                permalink = self._permalinks.get(key)
+                if permalink is not None:
+                    self.metrics.increment("cache.upload.hits")
+                    return permalink
+
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = self._pending[key] = threading.Event()
+                    break
+
+            # Other thread is uploading the same file, if it fails
+            #   the upload is tried again
+            pending.wait()
+
+        try:
+            permalink = None
+            if self.ledger is not None:
+                permalink = self.ledger.get_permalink(self.workspace_key, key)
+
+            if permalink is None:
+                self.metrics.increment("cache.upload.misses")
+                permalink = upload_func(path)
+                if self.ledger is not None:
+                    self.ledger.add_permalink(
+                        self.workspace_key, key, permalink
+                    )
+            else:
+                self.metrics.increment("cache.upload.hits")
+
+            with self._lock:
+                self._permalinks[key] = permalink
+            return permalink
+
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            pending.set()
+
+
+def stream_file_to_url(
+    url,
+    path,
+    chunk_size,
+    log,
+    ssl_context=None,
+    proxy=None,
+    timeout=30,
+):
+    """Send content of file to Slack upload URL in fixed size chunks.
+
+    Only one chunk is held in memory at a time.
+
+    Args:
+        url (str): Upload URL from 'files.getUploadURLExternal'.
+        path (str): Path to file.
+        chunk_size (int): Size of one chunk in bytes.
+        log (logging.Logger): Logger used to report progress.
+        ssl_context (Optional[ssl.SSLContext]): SSL context.
+        proxy (Optional[str]): Proxy URL.
+        timeout (float): Socket timeout in seconds.
+
+    Raises:
+        SlackUploadError: Slack did not accept the content.
+    """
+    parsed = urllib.parse.urlsplit(url)
+    request_path = parsed.path
+    if parsed.query:
+        request_path += "?" + parsed.query
+
+    if proxy:
+        parsed_proxy = urllib.parse.urlsplit(proxy)
+        connection = http.client.HTTPSConnection(
+            parsed_proxy.hostname,
+            parsed_proxy.port,
+            context=ssl_context,
+            timeout=timeout,
+        )
+        connection.set_tunnel(parsed.hostname, parsed.port)
+    elif parsed.scheme == "http":
+        # Local stand-in server
+        connection = http.client.HTTPConnection(
+            parsed.hostname, parsed.port, timeout=timeout
+        )
+    else:
+        connection = http.client.HTTPSConnection(
+            parsed.hostname,
+            parsed.port,
+            context=ssl_context,
+            timeout=timeout,
+        )
+
+    size = os.path.getsize(path)
+    filename = os.path.basename(path)
+    try:
+        connection.putrequest("POST", request_path)
+        connection.putheader("Content-Type", "application/octet-stream")
+        connection.putheader("Content-Length", str(size))
+        connection.endheaders()
+
+        sent = 0
+        next_report = 0.0
+        with open(path, "rb") as stream:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                connection.send(chunk)
+                sent += len(chunk)
+                progress = sent / size
+                if progress >= next_report:
+                    log.debug(
+                        "Uploading '{}' {:.0%} ({:.1f}/{:.1f} MB)".format(
+                            filename,
+                            progress,
+                            sent / 1048576,
+                            size / 1048576,
+                        )
+                    )
+                    next_report = progress + 0.1
+
+        response = connection.getresponse()
+        body = response.read()
+        if response.status != 200:
+            raise SlackUploadError(
+                "Failed to upload '{}' (status: {}, body: {})".format(
+                    filename, response.status, body[:200]
+                )
+            )
+    finally:
+        connection.close()
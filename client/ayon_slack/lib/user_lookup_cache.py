@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import threading
+
+from .directory_cache import get_slack_cache_dir, get_token_hash
+from .metrics import SlackMetrics
+
+LOOKUP_CACHE_FORMAT_VERSION = 1
+
+
+class SlackUserLookupCache:
+    """Slack user IDs found by email cached on disk.
+
+    Emails are looked up with 'users.lookupByEmail' only once. Emails
+    without Slack user are cached too, for shorter time, so publishes of
+    user who is not in Slack workspace do not call Slack every time.
+
+    Cache file is keyed by hash of the token, as is the directory cache.
+
+    Args:
+        token (str): Slack bot token.
+        log (logging.Logger): Logger.
+        ttl (float): Time to live of found user IDs in seconds.
+        negative_ttl (float): Time to live of emails without Slack user
+            in seconds.
+        cache_dir (Optional[str]): Directory of the cache file.
+        metrics (Optional[SlackMetrics]): Metrics where cache hits
+            are counted.
+    """
+    def __init__(
+        self,
+        token,
+        log,
+        ttl=30 * 24 * 60 * 60,
+        negative_ttl=24 * 60 * 60,
+        cache_dir=None,
+        metrics=None,
+    ):
+        if cache_dir is None:
+            cache_dir = get_slack_cache_dir("user_lookup")
+        if metrics is None:
+            metrics = SlackMetrics()
+        self.log = log
+        self.metrics = metrics
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.path = os.path.join(
+            cache_dir, "{}.json".format(get_token_hash(token))
+        )
+        self._lock = threading.Lock()
+        self._entries = None
+
+    def get_user_id(self, email, operations):
+        """Get Slack user ID for email.
+
+        Args:
+            email (str): Email address.
+            operations (SlackOperations): Client used for lookup of emails
+                which are not cached.
+
+        Returns:
+            Union[str, None]: Slack user ID or None if user was not found.
+        """
+        email = email.strip().lower()
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._read()
+
+            entry = self._entries.get(email)
+            if entry is not None:
+                slack_id, updated = entry
+                ttl = self.ttl if slack_id else self.negative_ttl
+                if time.time() - updated <= ttl:
+                    self.metrics.increment("cache.user_lookup.hits")
+                    return slack_id
+
+            self.metrics.increment("cache.user_lookup.misses")
+
+            try:
+                slack_id = operations.lookup_user_id_by_email(email)
+            except Exception:
+                # Do not cache errors which are not related to the email
+                self.log.warning(
+                    "Failed to look up Slack user by email.", exc_info=True
+                )
+                return None
+
+            self._entries[email] = [slack_id, time.time()]
+            self._write()
+            return slack_id
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as stream:
+                data = json.load(stream)
+        except Exception:
+            self.log.debug(
+                "Failed to read Slack user lookup cache '%s'.",
+                self.path, exc_info=True
+            )
+            return {}
+
+        if data.get("version") != LOOKUP_CACHE_FORMAT_VERSION:
+            return {}
+        return data.get("users") or {}
+
+    def _write(self):
+        # Merge with entries written by other processes meanwhile
+        entries = self._read()
+        entries.update(self._entries)
+        self._entries = entries
+
+        tmp_path = "{}.{}.tmp".format(self.path, os.getpid())
+        try:
+            with open(tmp_path, "w") as stream:
+                json.dump(
+                    {
+                        "version": LOOKUP_CACHE_FORMAT_VERSION,
+                        "users": entries,
+                    },
+                    stream,
+                    separators=(",", ":")
+                )
+            os.replace(tmp_path, self.path)
+        except Exception:
+            self.log.debug(
+                "Failed to write Slack user lookup cache '%s'.",
+                self.path, exc_info=True
+            )
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -1,9 +1,10 @@
 import pyblish.api
 
-from ayon_core.lib.profiles_filtering import filter_profiles
 from ayon_core.lib import attribute_definitions
 from ayon_core.pipeline import AYONPyblishPluginMixin
 
+from ayon_slack.lib import SlackProfileMatcher, get_alias_mentions
+
 
 class CollectSlackFamilies(pyblish.api.InstancePlugin,
                            AYONPyblishPluginMixin):
@@ -20,6 +21,17 @@ class CollectSlackFamilies(pyblish.api.InstancePlugin,
 
     profiles = []
 
+    _profile_matcher = None
+
+    @classmethod
+    def get_profile_matcher(cls):
+        """Matcher of profiles compiled once per loaded settings."""
+        matcher = cls._profile_matcher
+        if matcher is None or matcher.profiles is not cls.profiles:
+            matcher = SlackProfileMatcher(cls.profiles)
+            cls._profile_matcher = matcher
+        return matcher
+
     @classmethod
     def get_attribute_defs(cls):
         return [
@@ -50,9 +62,7 @@ class CollectSlackFamilies(pyblish.api.InstancePlugin,
             "product_names": instance.data["productName"],
         }
 
-        profile = filter_profiles(
-            self.profiles, key_values, logger=self.log
-        )
+        profile = self.get_profile_matcher().match(key_values)
         if not profile:
             self.log.info("No profile found, notification won't be send")
             return
@@ -64,12 +74,26 @@ class CollectSlackFamilies(pyblish.api.InstancePlugin,
         for prof in selected_profiles:
             prof["review_upload_limit"] = profile.get("review_upload_limit",
                                                       50)
+            prof["digest"] = profile.get("digest", False)
+            prof["review_proxy"] = profile.get("review_proxy")
+            prof["thumbnail_budget"] = profile.get("thumbnail_budget")
         instance.data["slack_channel_message_profiles"] = selected_profiles
+        instance.data["slack_delivery_workers"] = profile.get(
+            "delivery_workers", 1
+        )
 
-        slack_token = (instance.context.data["project_settings"]
-                                            ["slack"]
-                                            ["token"])
-        instance.data["slack_token"] = slack_token
+        slack_settings = instance.context.data["project_settings"]["slack"]
+        instance.data["slack_token"] = slack_settings["token"]
+        instance.data["slack_directory_cache_ttl"] = slack_settings.get(
+            "directory_cache_ttl", 24.0
+        )
+        instance.data["slack_delivery_mode"] = slack_settings.get(
+            "delivery_mode", "direct"
+        )
+        instance.data["slack_alias_mentions"] = get_alias_mentions(
+            slack_settings.get("user_aliases"),
+            slack_settings.get("group_aliases"),
+        )
 
         attribute_values = self.get_attr_values_from_data(instance.data)
         additional_message = attribute_values.get("additional_message")
@@ -1,129 +1,28 @@
-import os
 import re
-import copy
-import time
 
 import pyblish.api
 
-from ayon_core.lib.plugin_tools import prepare_template_data
-from ayon_core.pipeline.publish import get_publish_repre_path
-
-from ayon_core.lib import StringTemplate
-
-
-class SlackOperations:
-    def __init__(self, token, log):
-        from slack_sdk import WebClient
-
-        self.client = WebClient(token=token)
-        self.log = log
-
-    def _get_users_list(self):
-        return self.client.users_list()
-
-    def _get_usergroups_list(self):
-        return self.client.usergroups_list()
-
-    def get_users_and_groups(self):
-        from slack_sdk.errors import SlackApiError
-        while True:
-            try:
-                users = self._get_users()
-                groups = self._get_groups()
-                break
-            except SlackApiError as e:
-                retry_after = e.response.headers.get("Retry-After")
-                if retry_after:
-                    print(
-                        "Rate limit hit, sleeping for {}".format(retry_after))
-                    time.sleep(int(retry_after))
-                else:
-                    self.log.warning("Cannot pull user info, "
-                                     "mentions won't work", exc_info=True)
-                    return [], []
-            except Exception:
-                self.log.warning("Cannot pull user info, "
-                                 "mentions won't work", exc_info=True)
-                return [], []
-
-        return users, groups
-
-    def send_message(self, channel, message, publish_files):
-        from slack_sdk.errors import SlackApiError
-        try:
-            attachments = self._upload_attachments(publish_files)
-
-            message = self._add_attachments(attachments, message)
-
-            self.client.chat_postMessage(
-                channel=channel,
-                text=message
-            )
-        except SlackApiError as e:
-            # # You will get a SlackApiError if "ok" is False
-            if e.response.get("error"):
-                error_str = self._enrich_error(
-                    str(e.response["error"]), channel
-                )
-            else:
-                error_str = self._enrich_error(str(e), channel)
-            self.log.warning("Error happened: {}".format(error_str),
-                             exc_info=True)
-        except Exception as e:
-            error_str = self._enrich_error(str(e), channel)
-            self.log.warning("Not SlackAPI error", exc_info=True)
-
-    def _upload_attachments(self, publish_files):
-        """Returns list of permalinks to uploaded files"""
-        file_urls = []
-        for published_file in publish_files:
-            with open(published_file, "rb") as f:
-                uploaded_file = self.client.files_upload_v2(
-                    filename=os.path.basename(published_file),
-                    file=f
-                )
-                file_urls.append(uploaded_file.get("file").get("permalink"))
-
-        return file_urls
-
-    def _add_attachments(self, attachments, message):
-        """Add permalink urls to message without displaying url."""
-        for permalink_url in attachments:
-            # format extremely important!
-            message += f"<{permalink_url}| >"
-        return message
-
-    def _get_users(self):
-        """Parse users.list response into list of users (dicts)"""
-        first = True
-        next_page = None
-        users = []
-        while first or next_page:
-            response = self._get_users_list()
-            first = False
-            next_page = response.get("response_metadata").get("next_cursor")
-            for user in response.get("members"):
-                users.append(user)
-
-        return users
-
-    def _get_groups(self):
-        """Parses usergroups.list response into list of groups (dicts)"""
-        response = self._get_usergroups_list()
-        groups = []
-        for group in response.get("usergroups"):
-            groups.append(group)
-        return groups
-
-    def _enrich_error(self, error_str, channel):
-        """Enhance known errors with more helpful notations."""
-        if "not_in_channel" in error_str:
-            # there is no file.write.public scope, app must be explicitly in
-            # the channel
-            error_str += (
-                " - application must added to channel '{}'. Ask Slack admin."
-            ).format(channel)
-        return error_str
+from ayon_slack.lib import (
+    get_client_registry,
+    deliver_messages,
+    add_digest_message,
+    compile_template,
+    CaseVariantsData,
+    get_slack_metrics,
+    get_delivery_key,
+    get_thumbnail_path,
+    get_review_path,
+    get_upload_thumbnail,
+    handle_review_upload,
+    get_deferred_dir,
+    get_deferred_instance_key,
+    get_farm_deferred_paths,
+    record_deferred_notification,
+    REVIEW_PATH_PLACEHOLDER,
+    SPECIAL_MENTIONS,
+    has_mentions,
+    translate_mentions,
+)
 
 
 class IntegrateSlackAPI(pyblish.api.InstancePlugin):
@@ -137,6 +36,12 @@ class IntegrateSlackAPI(pyblish.api.InstancePlugin):
         If instance contains 'review' it could upload (if configured) or place
         link with {review_filepath} placeholder.
         Message template can contain {} placeholders from anatomyData.
+        {slack_author} is filled with mention of publishing user, found
+        by email of the AYON user.
+        Messages of instances processed on farm are rendered and stored
+        for farm publish job which sends them, see 'IntegrateSlackDeferred'.
+        Messages sent directly are recorded in ledger by published version,
+        so retried publish does not send them again.
     """
     order = pyblish.api.IntegratorOrder + 0.499
     label = "Integrate Slack Api"
@@ -146,195 +51,312 @@ class IntegrateSlackAPI(pyblish.api.InstancePlugin):
     optional = True
 
     def process(self, instance):
-        if instance.data.get("farm"):
+        metrics = get_slack_metrics(instance.context)
+        with metrics.measure("integrate.instance"):
+            self._process(instance, metrics)
+
+    def _process(self, instance, metrics):
+        is_farm = bool(instance.data.get("farm"))
+        if not is_farm and get_farm_deferred_paths(instance.context):
             self.log.debug(
-                "Instance is marked to be processed on farm. Skipping")
+                "Notification is sent by 'IntegrateSlackDeferred'. Skipping")
             return
 
-        thumbnail_path = self._get_thumbnail_path(instance)
-        review_path = self._get_review_path(instance)
+        thumbnail_path = review_path = None
+        if not is_farm:
+            thumbnail_path = get_thumbnail_path(instance)
+            review_path = get_review_path(instance)
 
         publish_files = set()
         token = instance.data["slack_token"]
-
+        registry = get_client_registry(instance.context, self.log)
+        client = registry.get_operations(token)
+
+        delivery_settings = {
+            "delivery_mode": instance.data.get(
+                "slack_delivery_mode", "direct"
+            ),
+            "workers": instance.data.get("slack_delivery_workers", 1),
+        }
+        deliveries = []
+        delivery_keys = []
+        deferred_profiles = []
+        version_id = (instance.data.get("versionEntity") or {}).get("id")
+        ledger = registry.get_ledger()
+        fill_data = self._get_fill_data(
+            instance,
+            # Review of farm instance is filled by farm publish job
+            REVIEW_PATH_PLACEHOLDER if is_farm else review_path,
+            slack_author=self._get_slack_author(instance, registry, client),
+        )
         additional_message = instance.data.get("slack_additional_message")
-        for message_profile in instance.data["slack_channel_message_profiles"]:
+        for profile_index, message_profile in enumerate(
+            instance.data["slack_channel_message_profiles"]
+        ):
             message = message_profile["message"]
             if additional_message:
                 message = f"{additional_message} \n {message}"
 
-            message = self._get_filled_content(
-                message, instance, review_path)
+            with metrics.measure("integrate.fill_content"):
+                message = self._get_filled_content(
+                    message, instance, review_path, fill_data)
 
             if not message:
-                return
+                break
 
             if message_profile["upload_thumbnail"] and thumbnail_path:
-                publish_files.add(thumbnail_path)
+                publish_files.add(
+                    get_upload_thumbnail(
+                        thumbnail_path, message_profile, self.log, registry)
+                )
 
             if message_profile["upload_review"] and review_path:
-                message, publish_files = self._handle_review_upload(
-                    message, message_profile, publish_files, review_path)
-
-            for channel in message_profile["channels"]:
-                channel = self._get_filled_content(
-                    channel, instance, review_path)
-
-                client = SlackOperations(token, self.log)
-
-                if "@" in message:
-                    cache_key = "__cache_slack_ids"
-                    slack_ids = instance.context.data.get(cache_key, None)
-                    if slack_ids is None:
-                        users, groups = client.get_users_and_groups()
-                        instance.context.data[cache_key] = {}
-                        instance.context.data[cache_key]["users"] = users
-                        instance.context.data[cache_key]["groups"] = groups
-                    else:
-                        users = slack_ids["users"]
-                        groups = slack_ids["groups"]
-                    message = self._translate_users(message, users, groups)
-
-                client.send_message(channel, message, publish_files)
-
-    def _handle_review_upload(self, message, message_profile, publish_files,
-                              review_path):
-        """Check if uploaded file is not too large"""
-        review_file_size_MB = os.path.getsize(review_path) / 1024 / 1024
-        file_limit = message_profile.get("review_upload_limit", 50)
-        if review_file_size_MB > file_limit:
-            message += "\nReview upload omitted because of file size."
-            if review_path not in message:
-                message += "\nFile located at: {}".format(review_path)
-        else:
-            publish_files.add(review_path)
-        return message, publish_files
-
-    def _get_filled_content(self, message, instance, review_path=None):
+                message, publish_files = handle_review_upload(
+                    message, message_profile, publish_files, review_path,
+                    self.log
+                )
+
+            if has_mentions(message):
+                with metrics.measure("integrate.translate_mentions"):
+                    message = self._translate_users(
+                        message,
+                        instance.data.get("slack_alias_mentions") or {},
+                        lambda: registry.get_directory_cache(
+                            token, self._get_directory_cache_ttl(instance)
+                        ).get_directory(client)
+                    )
+
+            channels = [
+                self._get_filled_content(
+                    channel, instance, review_path, fill_data)
+                for channel in message_profile["channels"]
+            ]
+            if is_farm:
+                deferred_profile = dict(message_profile)
+                deferred_profile["message"] = message
+                deferred_profile["channels"] = channels
+                deferred_profiles.append(deferred_profile)
+                continue
+
+            for channel in channels:
+                if message_profile.get("digest"):
+                    add_digest_message(
+                        instance.context,
+                        token,
+                        channel,
+                        message,
+                        list(publish_files),
+                        delivery_settings,
+                    )
+                    continue
+
+                delivery_key = None
+                if version_id:
+                    delivery_key = get_delivery_key(
+                        version_id,
+                        "{}:{}".format(
+                            profile_index, message_profile["message"]
+                        ),
+                        channel,
+                        message,
+                        publish_files,
+                    )
+                    if ledger.is_delivered(delivery_key):
+                        self.log.info(
+                            "Notification to '{}' was already sent."
+                            " Skipping".format(channel)
+                        )
+                        continue
+
+                deliveries.append((channel, message, list(publish_files)))
+                delivery_keys.append(delivery_key)
+
+        if is_farm:
+            self._record_deferred(
+                instance, deferred_profiles, delivery_settings)
+            return
+
+        with metrics.measure("integrate.deliver"):
+            results = deliver_messages(
+                client,
+                deliveries,
+                instance.context.data["projectName"],
+                self.log,
+                **delivery_settings
+            )
+
+        # Outbox and server only accept the message, it might still fail
+        #   and retried publish must send it again
+        if delivery_settings["delivery_mode"] != "direct":
+            return
+
+        for delivery, delivery_key, delivered in zip(
+            deliveries, delivery_keys, results
+        ):
+            if delivered and delivery_key:
+                ledger.add_delivery(delivery_key, delivery[0])
+
+    def _record_deferred(self, instance, deferred_profiles, delivery_settings):
+        """Store rendered messages of farm instance for farm publish job."""
+        if not deferred_profiles:
+            return
+
+        directory = get_deferred_dir(instance)
+        if not directory:
+            self.log.debug(
+                "Instance is marked to be processed on farm but output"
+                " directory is not known. Skipping")
+            return
+
+        path = record_deferred_notification(
+            directory,
+            instance.context.data["projectName"],
+            get_deferred_instance_key(instance),
+            deferred_profiles,
+            delivery_settings,
+        )
+        self.log.info(
+            "Slack notification will be sent by farm publish job,"
+            " stored to '{}'.".format(path)
+        )
+
+    def _get_directory_cache_ttl(self, instance):
+        """Time to live of cached Slack users and groups in seconds."""
+        ttl_hours = instance.data.get("slack_directory_cache_ttl", 24.0)
+        return ttl_hours * 60 * 60
+
+    def _get_filled_content(
+        self, message, instance, review_path=None, fill_data=None
+    ):
         """Use message and data from instance to get dynamic message content.
 
         Reviews might be large, so allow only adding link to message instead of
         uploading only.
+
+        Args:
+            message (str): Message template.
+            instance (pyblish.api.Instance): Published instance.
+            review_path (Optional[str]): Path to review file.
+            fill_data (Optional[dict[str, Any]]): Prepared data from
+                '_get_fill_data', created if not passed.
         """
+        if fill_data is None:
+            fill_data = self._get_fill_data(instance, review_path)
+
+        try:
+            message = compile_template(message).format(fill_data)
+        except Exception:
+            # shouldn't happen
+            self.log.warning(
+                "Some keys are missing in {}".format(message),
+                exc_info=True)
+
+        return message
+
+    def _get_fill_data(self, instance, review_path=None, slack_author=None):
+        """Data used to fill message templates of instance.
 
-        fill_data = copy.deepcopy(instance.data["anatomyData"])
+        Data are shared by all messages and channels of the instance and must
+        not be modified.
+        """
+        fill_data = dict(instance.data["anatomyData"])
         fill_data["comment"] = instance.data["comment"]
         anatomy = instance.context.data["anatomy"]
         fill_data["root"] = anatomy.roots
         if review_path:
             fill_data["review_filepath"] = review_path
+        if slack_author:
+            fill_data["slack_author"] = slack_author
+
+        # Case variants ('{Task[name]}', '{TASK[NAME]}') are created only
+        #   for keys used in templates
+        return CaseVariantsData(fill_data)
+
+    def _get_slack_author(self, instance, registry, client):
+        """Slack mention of user who publishes.
+
+        User is resolved only if any template of instance uses
+        '{slack_author}'. Alias from settings is used first, then Slack user
+        found by email of AYON user. Falls back to AYON username.
+        """
+        uses_author = any(
+            "slack_author" in message_profile["message"]
+            for message_profile in instance.data[
+                "slack_channel_message_profiles"
+            ]
+        )
+        username = instance.context.data.get("user")
+        if not uses_author or not username:
+            return None
+
+        alias_mentions = instance.data.get("slack_alias_mentions") or {}
+        mention = alias_mentions.get(username.casefold())
+        if mention:
+            return mention
 
-        message = (
-            message
-            .replace("{task}", "{task[name]}")
-            .replace("{Task}", "{Task[name]}")
-            .replace("{TASK}", "{TASK[NAME]}")
-            .replace("{asset}", "{folder[name]}")
-            .replace("{Asset}", "{Folder[name]}")
-            .replace("{ASSET}", "{FOLDER[NAME]}")
-            .replace("{subset}", "{product[name]}")
-            .replace("{Subset}", "{Product[name]}")
-            .replace("{SUBSET}", "{PRODUCT[NAME]}")
-            .replace("{family}", "{product[type]}")
-            .replace("{Family}", "{Product[type]}")
-            .replace("{FAMILY}", "{PRODUCT[TYPE]}")
+        token = instance.data["slack_token"]
+        return registry.get_user_mention(
+            token,
+            username,
+            lambda: self._find_slack_author(username, token, registry, client)
         )
 
-        multiple_case_variants = prepare_template_data(fill_data)
-        fill_data.update(multiple_case_variants)
+    def _find_slack_author(self, username, token, registry, client):
+        """Find Slack user by email of AYON user."""
+        import ayon_api
+
         try:
-            message = StringTemplate.format_template(message, fill_data)
+            user = ayon_api.get_user(username) or {}
         except Exception:
-            # shouldn't happen
             self.log.warning(
-                "Some keys are missing in {}".format(message),
-                exc_info=True)
+                "Failed to get AYON user '{}'.".format(username),
+                exc_info=True
+            )
+            return username
 
-        return message
+        email = (user.get("attrib") or {}).get("email")
+        if not email:
+            self.log.debug(
+                "User '{}' does not have email.".format(username)
+            )
+            return username
 
-    def _get_thumbnail_path(self, instance):
-        """Returns abs url for thumbnail if present in instance repres"""
-        thumbnail_path = None
-        for repre in instance.data.get("representations", []):
-            if repre.get("thumbnail") or "thumbnail" in repre.get("tags", []):
-                repre_thumbnail_path = get_publish_repre_path(
-                    instance, repre, False
-                )
-                if os.path.exists(repre_thumbnail_path):
-                    thumbnail_path = repre_thumbnail_path
-                break
-        return thumbnail_path
-
-    def _get_review_path(self, instance):
-        """Returns abs url for review if present in instance repres"""
-        review_path = None
-        for repre in instance.data.get("representations", []):
-            tags = repre.get("tags", [])
-            if (
-                repre.get("review")
-                or "review" in tags
-                or "burnin" in tags
-            ):
-                repre_review_path = get_publish_repre_path(
-                    instance, repre, False
-                )
-                if repre_review_path and os.path.exists(repre_review_path):
-                    review_path = repre_review_path
-                if "burnin" in tags:  # burnin has precedence if exists
-                    break
-        return review_path
-
-    def _get_user_id(self, users, user_name):
-        """Returns internal slack id for user name"""
-        user_name_lower = user_name.lower()
-        for user in users:
-            if user.get("deleted"):
-                continue
-            user_profile = user["profile"]
-            if user_name_lower in (
-                user["name"].lower(),
-                user_profile.get("display_name", "").lower(),
-                user_profile.get("real_name", "").lower(),
-            ):
-                return user["id"]
-        return None
-
-    def _get_group_id(self, groups, group_name):
-        """Returns internal group id for string name"""
-        for group in groups:
-            if (
-                not group.get("date_delete")
-                and group_name.lower() in (
-                    group["name"].lower(),
-                    group["handle"]
-                )
-            ):
-                return group["id"]
-        return None
-
-    def _translate_users(self, message, users, groups):
-        """Replace all occurences of @mentions with proper <@name> format."""
-        matches = re.findall(r"(?<!<)@\S+", message)
-        in_quotes = re.findall(r"(?<!<)(['\"])(@[^'\"]+)", message)
-        for item in in_quotes:
-            matches.append(item[1])
-        if not matches:
-            return message
-
-        for orig_user in matches:
-            user_name = orig_user.replace("@", "")
-            slack_id = self._get_user_id(users, user_name)
-            mention = None
-            if slack_id:
-                mention = "<@{}>".format(slack_id)
-            else:
-                slack_id = self._get_group_id(groups, user_name)
-                if slack_id:
-                    mention = "<!subteam^{}>".format(slack_id)
+        lookup_cache = registry.get_user_lookup_cache(token)
+        slack_id = lookup_cache.get_user_id(email, client)
+        if slack_id:
+            return "<@{}>".format(slack_id)
+        return username
+
+    def _translate_users(self, message, alias_mentions, get_directory):
+        """Replace all occurences of @mentions with proper <@name> format.
+
+        Special mentions and aliases from settings are resolved first,
+        Slack directory is fetched only for names which are still
+        unresolved.
+        """
+        directories = []
+
+        def _resolve(name):
+            folded_name = name.casefold()
+            mention = (
+                SPECIAL_MENTIONS.get(folded_name)
+                or alias_mentions.get(folded_name)
+            )
             if mention:
-                message = message.replace(orig_user, mention)
+                return mention
 
-        return message
+            if not directories:
+                directories.append(get_directory())
+            directory = directories[0]
+            slack_id = directory.get_user_id(name)
+            if slack_id:
+                return "<@{}>".format(slack_id)
+            slack_id = directory.get_group_id(name)
+            if slack_id:
+                return "<!subteam^{}>".format(slack_id)
+            return None
+
+        return translate_mentions(message, _resolve)
 
     def _escape_missing_keys(self, message, fill_data):
         """Double escapes placeholder which are missing in 'fill_data'"""
@@ -0,0 +1,51 @@
+import os
+
+import pyblish.api
+
+from ayon_slack.lib import close_client_registry
+from ayon_slack.lib.clients import CLIENT_REGISTRY_KEY
+from ayon_slack.lib.metrics import METRICS_KEY, METRICS_PATH_ENV
+
+
+class IntegrateSlackCleanup(pyblish.api.ContextPlugin):
+    """Close Slack clients shared by 'IntegrateSlackAPI'.
+
+    Runs after all Slack notifications of the publish session were sent.
+    Logs summary of Slack metrics and exports them to path from
+    'AYON_SLACK_METRICS_PATH' environment variable if set.
+    """
+    order = pyblish.api.IntegratorOrder + 0.4999
+    label = "Close Slack connections"
+    families = ["slack"]
+    settings_category = "slack"
+
+    def process(self, context):
+        registry = context.data.get(CLIENT_REGISTRY_KEY)
+        metrics = context.data.get(METRICS_KEY)
+        if registry is not None:
+            counters = registry.get_counters()
+            if counters.get("throttled"):
+                self.log.info(
+                    "Slack rate limited {throttled} of {calls} requests,"
+                    " {retried} retried, {failed} failed.".format(**counters)
+                )
+            if metrics is not None:
+                for key, value in counters.items():
+                    metrics.increment("requests." + key, value)
+        close_client_registry(context)
+
+        if metrics is None:
+            return
+
+        self.log.info("Slack metrics:\n{}".format(metrics.format_summary()))
+        metrics_path = os.environ.get(METRICS_PATH_ENV)
+        if metrics_path:
+            try:
+                metrics.export(metrics_path)
+            except Exception:
+                self.log.warning(
+                    "Failed to export Slack metrics to '{}'".format(
+                        metrics_path
+                    ),
+                    exc_info=True
+                )
@@ -0,0 +1,160 @@
+import pyblish.api
+
+from ayon_slack.lib import (
+    get_client_registry,
+    deliver_messages,
+    merge_channel_deliveries,
+    get_thumbnail_path,
+    get_review_path,
+    get_upload_thumbnail,
+    handle_review_upload,
+    get_deferred_instance_key,
+    get_farm_deferred_paths,
+    claim_deferred_record,
+    release_deferred_record,
+    finish_deferred_record,
+    get_deferred_message_key,
+    fill_deferred_review_path,
+)
+
+
+class IntegrateSlackDeferred(pyblish.api.ContextPlugin):
+    """Send Slack notifications of instances rendered on farm.
+
+    Messages are rendered by 'IntegrateSlackAPI' when the instance is
+    submitted to farm and stored next to publish job metadata. Farm publish
+    job sends them after its instances are integrated, with thumbnail and
+    review of published instances.
+
+    Messages of all instances of one publish job are merged into one
+    message per channel. Record is claimed before sending, so requeued
+    publish job does not send it again. Record with messages which failed
+    is returned, so requeued publish job sends the failed messages.
+    """
+    order = pyblish.api.IntegratorOrder + 0.499
+    label = "Integrate Slack Deferred"
+    settings_category = "slack"
+
+    def process(self, context):
+        paths = get_farm_deferred_paths(context)
+        if not paths:
+            self.log.debug("No deferred Slack notifications.")
+            return
+
+        token = context.data["project_settings"]["slack"]["token"]
+        if not token:
+            self.log.warning("Slack token is not set.")
+            return
+
+        registry = get_client_registry(context, self.log)
+        client = registry.get_operations(token)
+        for path in paths:
+            claimed = claim_deferred_record(path)
+            if claimed is None:
+                self.log.debug(
+                    "Slack notification '{}' was already sent or is being"
+                    " sent.".format(path)
+                )
+                continue
+
+            claimed_path, record = claimed
+            try:
+                sent = self._send_record(context, registry, client, record)
+            except Exception:
+                release_deferred_record(claimed_path, record)
+                raise
+
+            if sent:
+                finish_deferred_record(claimed_path)
+            else:
+                self.log.warning(
+                    "Failed to send some Slack notifications of '{}'."
+                    " They are sent by requeued publish job.".format(path)
+                )
+                release_deferred_record(claimed_path, record)
+
+    def _send_record(self, context, registry, client, record):
+        """Send messages of record which were not sent yet.
+
+        Sent messages are marked in record.
+
+        Returns:
+            bool: All messages of record were sent.
+        """
+        deliveries = []
+        for instance_key, message_profiles in (
+            record["instances"].items()
+        ):
+            instances = self._get_instances(context, instance_key)
+            deliveries.extend(
+                self._get_deliveries(instances, message_profiles, registry)
+            )
+
+        sent_keys = record.setdefault("sent", [])
+        deliveries = [
+            delivery
+            for delivery in merge_channel_deliveries(deliveries)
+            if get_deferred_message_key(*delivery[:2]) not in sent_keys
+        ]
+
+        delivery_settings = dict(record["delivery_settings"])
+        # Local outbox of farm machine would not be drained
+        if delivery_settings.get("delivery_mode") == "outbox":
+            delivery_settings["delivery_mode"] = "direct"
+
+        results = deliver_messages(
+            client,
+            deliveries,
+            record["project_name"],
+            self.log,
+            **delivery_settings
+        )
+        for delivery, delivered in zip(deliveries, results):
+            if delivered:
+                sent_keys.append(get_deferred_message_key(*delivery[:2]))
+        return all(results)
+
+    def _get_instances(self, context, instance_key):
+        """Published instances created from the submitted instance.
+
+        Product name of instance created for each AOV is extended by
+        name of the AOV.
+        """
+        output = []
+        for instance in context:
+            if not instance.data.get("publish", True):
+                continue
+            key = get_deferred_instance_key(instance)
+            if key == instance_key or key.startswith(instance_key + "_"):
+                output.append(instance)
+        return output
+
+    def _get_deliveries(self, instances, message_profiles, registry):
+        thumbnail_path = review_path = None
+        for instance in instances:
+            if thumbnail_path is None:
+                thumbnail_path = get_thumbnail_path(instance)
+            if review_path is None:
+                review_path = get_review_path(instance)
+
+        deliveries = []
+        for message_profile in message_profiles:
+            message = fill_deferred_review_path(
+                message_profile["message"], review_path
+            )
+            publish_files = set()
+            if message_profile["upload_thumbnail"] and thumbnail_path:
+                publish_files.add(
+                    get_upload_thumbnail(
+                        thumbnail_path, message_profile, self.log, registry)
+                )
+
+            if message_profile["upload_review"] and review_path:
+                message, publish_files = handle_review_upload(
+                    message, message_profile, publish_files, review_path,
+                    self.log
+                )
+
+            for channel in message_profile["channels"]:
+                deliveries.append((channel, message, list(publish_files)))
+        return deliveries
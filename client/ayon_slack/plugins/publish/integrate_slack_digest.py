@@ -0,0 +1,35 @@
+import pyblish.api
+
+from ayon_slack.lib import (
+    get_client_registry,
+    deliver_messages,
+    pop_digest_deliveries,
+)
+
+
+class IntegrateSlackDigest(pyblish.api.ContextPlugin):
+    """Send one Slack message per channel for all published instances.
+
+    Messages are collected by 'IntegrateSlackAPI' for profiles with
+    enabled digest.
+    """
+    order = pyblish.api.IntegratorOrder + 0.4995
+    label = "Integrate Slack Digest"
+    families = ["slack"]
+    settings_category = "slack"
+
+    def process(self, context):
+        digest_deliveries = pop_digest_deliveries(context)
+        if not digest_deliveries:
+            self.log.debug("No Slack digest messages to send.")
+            return
+
+        registry = get_client_registry(context, self.log)
+        for token, delivery_settings, deliveries in digest_deliveries:
+            deliver_messages(
+                registry.get_operations(token),
+                deliveries,
+                context.data["projectName"],
+                self.log,
+                **delivery_settings
+            )
@@ -1,7 +1,10 @@
 import os
+import time
+
 from ayon_core.addon import (
     AYONAddon,
     IPluginPaths,
+    click_wrap,
 )
 
 from .version import __version__
@@ -26,3 +29,48 @@ class SlackIntegrationAddon(AYONAddon, IPluginPaths):
         return [
             os.path.join(SLACK_ADDON_DIR, "plugins", "publish")
         ]
+
+    def cli(self, click_group):
+        click_group.add_command(cli_main.to_click_obj())
+
+
+@click_wrap.group(
+    SlackIntegrationAddon.name,
+    help="Slack addon related commands."
+)
+def cli_main():
+    pass
+
+
+@cli_main.command()
+@click_wrap.option(
+    "--watch",
+    is_flag=True,
+    help="Keep running and check outbox periodically."
+)
+@click_wrap.option(
+    "--interval",
+    type=int,
+    default=30,
+    help="Seconds between outbox checks with '--watch'."
+)
+def drain_outbox(watch, interval):
+    """Send Slack notifications stored in local outbox."""
+    from .lib import SlackOutbox
+
+    outbox = SlackOutbox()
+    while True:
+        try:
+            result = outbox.drain()
+        except Exception:
+            if not watch:
+                raise
+            outbox.log.warning("Failed to drain Slack outbox", exc_info=True)
+        else:
+            outbox.log.info(
+                "Slack outbox: {sent} sent, {postponed} postponed,"
+                " {failed} failed.".format(**result)
+            )
+        if not watch:
+            break
+        time.sleep(interval)
@@ -0,0 +1,212 @@
+"""'SlackProfileMatcher' must give the same results as 'filter_profiles'.
+
+    python -m pytest client/tests
+"""
+import os
+import re
+import random
+import importlib.util
+
+import pytest
+
+PROFILES_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "ayon_slack",
+    "lib",
+    "profiles.py",
+)
+KEYS_ORDER = (
+    "product_base_types",
+    "host_names",
+    "task_names",
+    "task_types",
+    "product_names",
+)
+
+
+def _load_profiles_module():
+    # Package 'ayon_slack' requires 'ayon_core', module has no dependencies
+    spec = importlib.util.spec_from_file_location(
+        "slack_test_profiles", PROFILES_PATH
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+SlackProfileMatcher = _load_profiles_module().SlackProfileMatcher
+
+
+def _validate_value_by_regexes(value, in_list):
+    if not in_list:
+        return 0
+    if not isinstance(in_list, (list, tuple, set)):
+        in_list = [in_list]
+    if "*" in in_list:
+        return 0
+    if not value:
+        return -1
+    for item in in_list:
+        if item and re.compile(item).fullmatch(value):
+            return 1
+    return -1
+
+
+def _reference_filter_profiles(profiles, key_values):
+    """Copy of 'ayon_core.lib.filter_profiles' logic."""
+    if not profiles:
+        return None
+
+    matching_profiles = None
+    highest_points = -1
+    for profile in profiles:
+        points = 0
+        scores = []
+        for key, value in key_values.items():
+            match = _validate_value_by_regexes(value, profile.get(key))
+            if match == -1:
+                break
+            points += match
+            scores.append(bool(match))
+        else:
+            if points > highest_points:
+                matching_profiles = []
+                highest_points = points
+            if points == highest_points:
+                matching_profiles.append((profile, scores))
+
+    if not matching_profiles:
+        return None
+
+    for idx in range(len(matching_profiles[0][1])):
+        if len(matching_profiles) == 1:
+            break
+        profiles_true = [item for item in matching_profiles if item[1][idx]]
+        if profiles_true:
+            matching_profiles = profiles_true
+    return matching_profiles[0][0]
+
+
+def _get_filter_profiles():
+    try:
+        from ayon_core.lib import filter_profiles
+    except ImportError:
+        return _reference_filter_profiles
+
+    return lambda profiles, key_values: filter_profiles(
+        profiles, key_values
+    )
+
+
+filter_profiles = _get_filter_profiles()
+
+
+def _profile(index, **filters):
+    profile = {key: [] for key in KEYS_ORDER}
+    profile.update(filters)
+    profile["index"] = index
+    return profile
+
+
+def _key_values(**values):
+    output = {key: "" for key in KEYS_ORDER}
+    output.update(values)
+    return output
+
+
+def _assert_same(profiles, key_values):
+    expected = filter_profiles(profiles, key_values)
+    result = SlackProfileMatcher(profiles).match(key_values)
+    assert result is expected
+
+
+CASES = [
+    # No profiles
+    ([], _key_values(host_names="maya")),
+    # Empty filters match anything
+    ([_profile(0)], _key_values(host_names="maya")),
+    # '*' matches anything, also missing value
+    (
+        [_profile(0, host_names=["*"]), _profile(1, host_names=["nuke"])],
+        _key_values(host_names="maya"),
+    ),
+    # Filter does not match missing value
+    ([_profile(0, task_names=["comp"])], _key_values(host_names="maya")),
+    # Regex filters
+    (
+        [
+            _profile(0, task_names=["comp.*"]),
+            _profile(1, task_names=["lighting"]),
+        ],
+        _key_values(task_names="compositing"),
+    ),
+    # Regex must match whole value
+    ([_profile(0, task_names=["comp"])], _key_values(task_names="comp2")),
+    # Profile with more matching filters wins
+    (
+        [
+            _profile(0, host_names=["maya"]),
+            _profile(1, host_names=["maya"], task_names=["anim"]),
+        ],
+        _key_values(host_names="maya", task_names="anim"),
+    ),
+    # Tie is resolved by order of keys
+    (
+        [
+            _profile(0, task_names=["anim"]),
+            _profile(1, host_names=["maya"]),
+        ],
+        _key_values(host_names="maya", task_names="anim"),
+    ),
+    # Tie with the same filters resolves to first profile
+    (
+        [_profile(0, host_names=["maya"]), _profile(1, host_names=["maya"])],
+        _key_values(host_names="maya"),
+    ),
+    # Empty filter values are ignored
+    ([_profile(0, host_names=["", "maya"])], _key_values(host_names="maya")),
+    ([_profile(0, host_names=[""])], _key_values(host_names="maya")),
+]
+
+
+@pytest.mark.parametrize("profiles,key_values", CASES)
+def test_matches_filter_profiles(profiles, key_values):
+    _assert_same(profiles, key_values)
+
+
+def test_random_profiles():
+    rnd = random.Random(0)
+    filter_values = {
+        "product_base_types": ["render", "review", "model", "*", "re.*"],
+        "host_names": ["maya", "nuke", "houdini", "*"],
+        "task_names": ["anim", "comp", "comp.*", "lighting", ""],
+        "task_types": ["Animation", "Compositing", "Lighting"],
+        "product_names": ["renderMain", "render.*Main", "modelMain"],
+    }
+    values = {
+        "product_base_types": ["render", "review", "model", ""],
+        "host_names": ["maya", "nuke", "houdini"],
+        "task_names": ["anim", "comp", "compositing", "lighting", ""],
+        "task_types": ["Animation", "Compositing", "Lighting", ""],
+        "product_names": ["renderMain", "renderBgMain", "modelMain", ""],
+    }
+    for _ in range(500):
+        profiles = []
+        for index in range(rnd.randint(0, 8)):
+            filters = {}
+            for key, options in filter_values.items():
+                if rnd.random() < 0.5:
+                    filters[key] = rnd.sample(
+                        options, rnd.randint(1, len(options))
+                    )
+            profiles.append(_profile(index, **filters))
+
+        matcher = SlackProfileMatcher(profiles)
+        for _ in range(10):
+            key_values = {
+                key: rnd.choice(options) for key, options in values.items()
+            }
+            expected = filter_profiles(profiles, key_values)
+            assert matcher.match(key_values) is expected, (
+                profiles, key_values
+            )
@@ -9,12 +9,21 @@ from .settings import (
     DEFAULT_SLACK_SETTING,
     convert_settings_overrides,
 )
+from .delivery import SlackDeliveryWorker
 
 
 class Slack(BaseServerAddon):
 
     settings_model = SlackSettings
 
+    async def setup(self):
+        self._delivery_worker = SlackDeliveryWorker(self._get_project_token)
+        self._delivery_worker.start()
+
+    async def _get_project_token(self, project_name: str) -> str:
+        settings = await self.get_project_settings(project_name)
+        return settings.token
+
     async def get_default_settings(self):
         settings_model_cls = self.get_settings_model()
         return settings_model_cls(**DEFAULT_SLACK_SETTING)
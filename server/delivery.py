@@ -0,0 +1,236 @@
+"""Delivery of Slack notifications dispatched by clients as events.
+
+Clients with delivery mode 'server' do not post messages to Slack, they
+dispatch 'slack.notify' event with rendered messages instead. Worker
+started by the addon claims pending events and posts the messages using one
+HTTP client and one rate limiter for the whole studio.
+"""
+from __future__ import annotations
+
+import time
+import random
+import asyncio
+from typing import Any, Callable, Awaitable
+
+import httpx
+
+from ayon_server.lib.postgres import Postgres
+from ayon_server.logging import logger
+
+SLACK_NOTIFY_TOPIC = "slack.notify"
+SLACK_API_URL = "https://slack.com/api/"
+# Seconds between checks for new events
+POLL_INTERVAL = 5.0
+# Event is marked as failed after this number of unsuccessful attempts
+MAX_RETRIES = 5
+# Base delay in seconds before failed event is processed again
+RETRY_DELAY = 30.0
+# Events in progress without update for this time (seconds) were abandoned
+#   by crashed or restarted server and are claimed again
+CLAIM_TIMEOUT = 600.0
+# 'chat.postMessage' allows about 1 message per second per channel
+POST_INTERVAL = 1.0
+
+
+class ChannelRateLimiter:
+    """Keeps minimal interval between posts to the same channel."""
+
+    def __init__(self, interval: float = POST_INTERVAL):
+        self.interval = interval
+        self._next_post: dict[str, float] = {}
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """Pause all posts, used when Slack responds with HTTP 429."""
+        self._paused_until = max(
+            self._paused_until, time.monotonic() + seconds
+        )
+
+    async def wait(self, channel: str) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            post_time = max(
+                now,
+                self._paused_until,
+                self._next_post.get(channel, 0.0),
+            )
+            self._next_post[channel] = post_time + self.interval
+        if post_time > now:
+            await asyncio.sleep(post_time - now)
+
+
+class SlackDeliveryWorker:
+    """Posts messages of pending 'slack.notify' events to Slack.
+
+    Events are claimed with 'FOR UPDATE SKIP LOCKED', so it is safe to run
+    the worker in multiple server processes. Event is updated after each
+    posted message, events in progress without update for 'CLAIM_TIMEOUT'
+    are claimed again and only their unsent messages are posted.
+
+    Args:
+        get_token (Callable[[str], Awaitable[str]]): Returns Slack token
+            for project name.
+    """
+
+    def __init__(self, get_token: Callable[[str], Awaitable[str]]):
+        self._get_token = get_token
+        self._limiter = ChannelRateLimiter()
+        self._client: httpx.AsyncClient | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        task = self._task
+        if task is None:
+            return
+        self._task = None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self) -> None:
+        self._client = httpx.AsyncClient(base_url=SLACK_API_URL, timeout=30)
+        try:
+            while True:
+                try:
+                    while await self._process_next_event():
+                        pass
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception("Slack delivery worker failed")
+                await asyncio.sleep(POLL_INTERVAL)
+        finally:
+            # Runs also when server cancels remaining tasks on shutdown
+            client, self._client = self._client, None
+            await client.aclose()
+
+    async def _process_next_event(self) -> bool:
+        """Claim and process one event.
+
+        Returns:
+            bool: Event was processed.
+        """
+        res = await Postgres.fetch(
+            """
+            UPDATE events SET status = 'in_progress', updated_at = NOW()
+            WHERE id = (
+                SELECT id FROM events
+                WHERE
+                    topic = $1
+                    AND (
+                        (
+                            status = 'pending'
+                            -- Postpone failed events, longer with each retry
+                            AND updated_at <= NOW() - make_interval(
+                                secs => $2 * retries * retries
+                            )
+                        )
+                        OR (
+                            -- Abandoned by crashed or restarted server
+                            status = 'in_progress'
+                            AND updated_at <= NOW() - make_interval(
+                                secs => $3
+                            )
+                        )
+                    )
+                ORDER BY created_at
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id, project_name, payload, retries
+            """,
+            SLACK_NOTIFY_TOPIC,
+            RETRY_DELAY,
+            CLAIM_TIMEOUT,
+        )
+        if not res:
+            return False
+
+        row = res[0]
+        payload: dict[str, Any] = row["payload"] or {}
+        deliveries = payload.get("deliveries") or []
+        try:
+            token = await self._get_token(row["project_name"])
+            if not token:
+                raise ValueError("Slack token is not set")
+            for delivery in deliveries:
+                if delivery.get("sent"):
+                    continue
+                await self._post_message(
+                    token, delivery["channel"], delivery["message"]
+                )
+                delivery["sent"] = True
+                # Store progress and keep the claim alive
+                await self._update_event(
+                    row["id"], "in_progress",
+                    f"Slack message sent to {delivery['channel']}",
+                    payload, row["retries"]
+                )
+
+        except Exception as exc:
+            retries = row["retries"] + 1
+            status = "failed" if retries >= MAX_RETRIES else "pending"
+            await self._update_event(
+                row["id"], status, f"Slack delivery failed: {exc}",
+                payload, retries
+            )
+            return True
+
+        await self._update_event(
+            row["id"], "finished",
+            f"Slack message sent to {len(deliveries)} channel(s)",
+            payload, row["retries"]
+        )
+        return True
+
+    async def _post_message(
+        self, token: str, channel: str, message: str
+    ) -> None:
+        assert self._client is not None
+        for _ in range(MAX_RETRIES):
+            await self._limiter.wait(channel)
+            response = await self._client.post(
+                "chat.postMessage",
+                headers={"Authorization": f"Bearer {token}"},
+                json={"channel": channel, "text": message},
+            )
+            if response.status_code == 429:
+                retry_after = float(response.headers.get("Retry-After", 1))
+                retry_after += random.uniform(0.0, 0.25 * retry_after + 0.5)
+                self._limiter.pause(retry_after)
+                continue
+
+            response.raise_for_status()
+            data = response.json()
+            if not data.get("ok"):
+                raise ValueError(data.get("error") or "unknown error")
+            return
+        raise ValueError("Slack rate limit retries exhausted")
+
+    async def _update_event(
+        self,
+        event_id: str,
+        status: str,
+        description: str,
+        payload: dict[str, Any],
+        retries: int,
+    ) -> None:
+        await Postgres.execute(
+            """
+            UPDATE events SET
+                status = $2,
+                description = $3,
+                payload = $4,
+                retries = $5,
+                updated_at = NOW()
+            WHERE id = $1
+            """,
+            event_id, status, description, payload, retries,
+        )
@@ -3,10 +3,61 @@ from ayon_server.settings import SettingsField, BaseSettingsModel
 from .publish_plugins import SlackPublishPlugins
 
 
+def delivery_mode_enum():
+    return [
+        {"value": "direct", "label": "Send during publishing"},
+        {"value": "outbox", "label": "Local outbox"},
+        {"value": "server", "label": "AYON server"},
+    ]
+
+
+class MentionAliasModel(BaseSettingsModel):
+    name: str = SettingsField("", title="Name")
+    slack_id: str = SettingsField("", title="Slack ID")
+
+
 class SlackSettings(BaseSettingsModel):
     """Slack project settings."""
     enabled: bool = SettingsField(default=True)
     token: str = SettingsField("", title="Auth Token")
+    directory_cache_ttl: float = SettingsField(
+        24.0,
+        title="Users cache lifetime (hours)",
+        description=(
+            "Slack users and user groups used to resolve @mentions are"
+            " cached on disk of each machine for this time. Value 0"
+            " disables the cache."
+        ),
+        ge=0.0,
+    )
+    delivery_mode: str = SettingsField(
+        "direct",
+        title="Delivery mode",
+        enum_resolver=delivery_mode_enum,
+        description=(
+            "'Local outbox' stores notifications on disk and publishing"
+            " does not wait for Slack. They are sent by"
+            " 'ayon addon slack drain-outbox' command. 'AYON server'"
+            " uploads files and leaves posting of messages to AYON server."
+        ),
+    )
+    user_aliases: list[MentionAliasModel] = SettingsField(
+        default_factory=list,
+        title="User aliases",
+        description=(
+            "Slack user ID (e.g. 'U0123ABCD') used for @mention of AYON"
+            " username. Aliases are resolved without downloading Slack"
+            " users."
+        ),
+    )
+    group_aliases: list[MentionAliasModel] = SettingsField(
+        default_factory=list,
+        title="User group aliases",
+        description=(
+            "Slack user group ID (e.g. 'S0123ABCD') used for @mention"
+            " of group name."
+        ),
+    )
 
     publish: SlackPublishPlugins = SettingsField(
         title="Publish plugins",
@@ -17,6 +68,10 @@ class SlackSettings(BaseSettingsModel):
 
 DEFAULT_SLACK_SETTING = {
     "token": "",
+    "directory_cache_ttl": 24.0,
+    "delivery_mode": "direct",
+    "user_aliases": [],
+    "group_aliases": [],
     "publish": {
         "CollectSlackFamilies": {
             "enabled": True,
@@ -29,6 +84,20 @@ DEFAULT_SLACK_SETTING = {
                     "tasks": [],
                     "subsets": [],
                     "review_upload_limit": 50.0,
+                    "review_proxy": {
+                        "enabled": False,
+                        "format": "h264",
+                        "max_width": 1280,
+                        "target_size": 0.0,
+                        "fps": 12
+                    },
+                    "thumbnail_budget": {
+                        "enabled": True,
+                        "max_dimension": 1024,
+                        "max_size": 300.0
+                    },
+                    "delivery_workers": 1,
+                    "digest": False,
                     "channel_messages": []
                 }
             ]
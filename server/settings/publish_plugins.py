@@ -25,6 +25,73 @@ class ChannelMessage(BaseSettingsModel):
     )
 
 
+def review_proxy_format_enum():
+    return [
+        {"value": "h264", "label": "H.264 (mp4)"},
+        {"value": "gif", "label": "Animated GIF"},
+        {"value": "webp", "label": "Animated WebP"},
+    ]
+
+
+class ReviewProxyModel(BaseSettingsModel):
+    _isGroup = True
+    enabled: bool = SettingsField(
+        False,
+        title="Enabled",
+        description=(
+            "Upload smaller proxy created with ffmpeg when review is"
+            " larger than upload limit."
+        ),
+    )
+    format: str = SettingsField(
+        "h264",
+        title="Format",
+        enum_resolver=review_proxy_format_enum,
+    )
+    max_width: int = SettingsField(
+        1280,
+        title="Maximum width",
+        ge=64,
+    )
+    target_size: float = SettingsField(
+        0.0,
+        title="Target file size (MB)",
+        description=(
+            "Bitrate of H.264 proxy is computed to fit this size."
+            " Value 0 uses upload maximum file size."
+        ),
+        ge=0,
+    )
+    fps: int = SettingsField(
+        12,
+        title="Animated image FPS",
+        ge=1,
+        le=60,
+    )
+
+
+class ThumbnailBudgetModel(BaseSettingsModel):
+    _isGroup = True
+    enabled: bool = SettingsField(
+        True,
+        title="Enabled",
+        description=(
+            "Downscale and recompress thumbnail larger than budget"
+            " before upload."
+        ),
+    )
+    max_dimension: int = SettingsField(
+        1024,
+        title="Maximum width/height (px)",
+        ge=64,
+    )
+    max_size: float = SettingsField(
+        300.0,
+        title="Maximum file size (KB)",
+        ge=10,
+    )
+
+
 class CollectSlackFamilyProfile(BaseSettingsModel):
     host_names: list[str] = SettingsField(
         default_factory=list,
@@ -50,6 +117,32 @@ class CollectSlackFamilyProfile(BaseSettingsModel):
     review_upload_limit: float = SettingsField(
         50.0,
         title="Upload review maximum file size (MB)")
+    review_proxy: ReviewProxyModel = SettingsField(
+        default_factory=ReviewProxyModel,
+        title="Review proxy",
+    )
+    thumbnail_budget: ThumbnailBudgetModel = SettingsField(
+        default_factory=ThumbnailBudgetModel,
+        title="Thumbnail budget",
+    )
+    delivery_workers: int = SettingsField(
+        1,
+        title="Parallel channel deliveries",
+        description=(
+            "Number of channels to which messages are sent at the same"
+            " time. Value 1 sends messages one by one."
+        ),
+        ge=1,
+        le=16,
+    )
+    digest: bool = SettingsField(
+        False,
+        title="Send digest",
+        description=(
+            "Send one message per channel with all published products"
+            " instead of one message per product."
+        ),
+    )
 
     _desc = ("Message sent to channel selected by profile. "
              "Message template can contain {} placeholders from anatomyData "